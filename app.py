@@ -3,13 +3,16 @@
 
 # External modules
 import streamlit as st
-import pandas as pd
-import sys, os, math, json
+import sys, os, math
 import logging
-from pathlib import Path
 from datetime import datetime, timedelta
+from utils.assets import read_text
+from utils.images import AIR_LOGO_WIDTH, FIGURE_WIDTH, ICON_WIDTH, LOGO_WIDTH, sized_image
 from utils.metadata import get_parameter_metadata
-from utils.settings import config
+from utils.metrics import section_timer, start_metrics_server
+from utils.prefetch import prefetch
+from utils.profiling import label, profile_rerun
+from utils.watcher import start_watcher
 
 
 # SETTING PAGE CONFIG TO WIDE MODE
@@ -18,39 +21,21 @@ st.set_page_config(
     layout="centered",  # Can be "centered" or "wide". In the future also "dashboard", etc.
     initial_sidebar_state="expanded",  # Can be "auto", "expanded", "collapsed"
     page_title="Icestupa",  # String or None. Strings get appended with "• Streamlit".
-    page_icon=air_logo,  # String, anything supported by st.image, or None.
+    page_icon=sized_image(air_logo, ICON_WIDTH),  # String, anything supported by st.image, or None.
 )
 
 # github_url = "https://github.com/gayashiva/air_model/tree/master/"
 
 
-@st.cache
-def vars(df):
-    input_cols = []
-    input_vars = []
-    output_cols = []
-    output_vars = []
-    derived_cols = []
-    derived_vars = []
-    for variable in df.columns:
-        v = get_parameter_metadata(variable)
-        if v["kind"] == "Input":
-            input_cols.append(v["name"])
-            input_vars.append(variable)
-        if v["kind"] == "Output":
-            output_cols.append(v["name"])
-            output_vars.append(variable)
-        if v["kind"] == "Derived":
-            derived_cols.append(v["name"])
-            derived_vars.append(variable)
-    return input_cols, input_vars, output_cols, output_vars, derived_cols, derived_vars
-
-
-if __name__ == "__main__":
+def main():
     # Main logger
     logger = logging.getLogger(__name__)
     logger.setLevel("WARNING")
 
+    start_metrics_server()
+    start_watcher()
+    prefetch()
+
     st.sidebar.markdown(
         """
     # Select Ice Reservoir
@@ -67,7 +52,7 @@ if __name__ == "__main__":
     if location == "Home":
         row1_1, row1_2 = st.columns((2, 5))
         with row1_1:
-            st.image(air_logo, width=160)
+            st.image(sized_image(air_logo, AIR_LOGO_WIDTH), width=AIR_LOGO_WIDTH)
 
         with row1_2:
             st.markdown(
@@ -95,6 +80,18 @@ if __name__ == "__main__":
         st.video(url)
 
     else:
+        # The data stack is only imported once a site is chosen
+        import pandas as pd
+        from utils.settings import SITES, config
+        from utils.data import load_schema, classify_columns
+        from utils.charts import chart_frame, chart_series
+        from utils.calibration import best, load_loo, loo_runs, nearest, parameters, select
+        from utils.discharge import discharge_curves, fitted, season_discharge
+        from utils.ensembles import ensemble_stats, ensembles, freezing_rate, freezing_rate_axes, uncertain_parameters
+        from utils.ingest import aggregation, ingest_if_changed, live_daily, live_end, live_stats, load_live
+        from utils.results import load_results
+        from utils.stats import describe, load_stats
+        from utils.whatif import WHATIF_CONSTANTS, calibrated, slider_range, totals, what_if
 
         loc_dict ={
                 "Gangles 2021": "gangles21",
@@ -110,8 +107,6 @@ if __name__ == "__main__":
 
         CONSTANTS, SITE, FOLDER = config(location)
 
-        df = pd.read_hdf("data/" + location + "/processed/" + spray + "/output.h5", "df")
-
         (
             input_cols,
             input_vars,
@@ -119,12 +114,17 @@ if __name__ == "__main__":
             output_vars,
             derived_cols,
             derived_vars,
-        ) = vars(df)
+        ) = classify_columns(location, spray, load_schema(location, spray))
+        stats = load_stats(location, spray)
+        # AWS rows of the running season that the model has not seen yet
+        ingest_if_changed(location)
+        aws_end = live_end(location)
+        aws_new = aws_end is not None and aws_end > pd.Timestamp(stats["end"])
 
         row1_1, row1_2 = st.columns((2, 5))
 
         with row1_1:
-            st.image(air_logo, width=160)
+            st.image(sized_image(air_logo, AIR_LOGO_WIDTH), width=AIR_LOGO_WIDTH)
 
         with row1_2:
             st.markdown(
@@ -141,6 +141,10 @@ if __name__ == "__main__":
                 "Input",
                 "Output",
                 "Derived",
+                "Calibration",
+                "Uncertainty",
+                "What-if",
+                "Discharge",
             ]
             display = st.multiselect(
                 "Choose type of web below:",
@@ -148,10 +152,27 @@ if __name__ == "__main__":
                 # default=["Validation"],
                 default=["Validation", "Timelapse"],
             )
-            intro_markdown = Path("utils/intro.md").read_text()
+            label(location, *display)
+            intro_markdown = read_text("utils/intro.md")
             st.markdown(intro_markdown, unsafe_allow_html=True)
 
         st.markdown("---")
+        st.sidebar.write("### Time window")
+        season = (
+            pd.Timestamp(stats["start"]).to_pydatetime(),
+            pd.Timestamp(stats["end"]).to_pydatetime(),
+        )
+        window = st.sidebar.slider(
+            " ",
+            min_value=season[0],
+            max_value=season[1],
+            value=season,
+            format="MMM DD",
+        )
+        # Whole season reads from the precomputed statistics and aggregates
+        start = None if window[0] <= season[0] else window[0]
+        end = None if window[1] >= season[1] else window[1]
+
         st.sidebar.write("### Map")
         lat = SITE["coords"][0]
         lon = SITE["coords"][1]
@@ -168,25 +189,25 @@ if __name__ == "__main__":
         row3_1, row3_2 = st.columns((1, 1))
         with row2_1:
             st.image(
-                "logos/unifr.png",
+                sized_image("logos/unifr.png", LOGO_WIDTH),
                 caption="UniFR",
                 use_column_width=True,
             )
             st.markdown(" ")
             st.image(
-                "logos/GA.png",
+                sized_image("logos/GA.png", LOGO_WIDTH),
                 caption="GlaciersAlive",
                 use_column_width=True,
             )
             st.markdown(" ")
             st.image(
-                "logos/ng-logo.png",
+                sized_image("logos/ng-logo.png", LOGO_WIDTH),
                 # caption="GlaciersAlive",
                 use_column_width=True,
             )
         with row2_2:
             st.image(
-                "logos/HIAL-logo.png",
+                sized_image("logos/HIAL-logo.png", LOGO_WIDTH),
                 caption="HIAL",
                 use_column_width=True,
             )
@@ -194,20 +215,20 @@ if __name__ == "__main__":
             st.markdown(" ")
             st.markdown(" ")
             st.image(
-                "logos/logo-schwarzsee.png",
+                sized_image("logos/logo-schwarzsee.png", LOGO_WIDTH),
                 caption="Schwarzsee Tourism",
                 use_column_width=True,
             )
             st.markdown(" ")
             st.markdown(" ")
             st.image(
-                "logos/dfrobot.png",
+                sized_image("logos/dfrobot.png", LOGO_WIDTH),
                 # caption="GlaciersAlive",
                 use_column_width=True,
             )
         with row2_3:
             st.image(
-                "logos/guttannen-bewegt.png",
+                sized_image("logos/guttannen-bewegt.png", LOGO_WIDTH),
                 caption="Guttannen Moves",
                 use_column_width=True,
             )
@@ -215,7 +236,7 @@ if __name__ == "__main__":
             st.markdown(" ")
             st.markdown(" ")
             st.image(
-                "logos/Logo-Swiss-Polar-Institute.png",
+                sized_image("logos/Logo-Swiss-Polar-Institute.png", LOGO_WIDTH),
                 use_column_width=True,
             )
             st.markdown(" ")
@@ -223,7 +244,7 @@ if __name__ == "__main__":
             st.markdown(" ")
             st.markdown(" ")
             st.image(
-                "logos/hochschule-luzern.jpg",
+                sized_image("logos/hochschule-luzern.jpg", LOGO_WIDTH),
                 # caption="GlaciersAlive",
                 use_column_width=True,
             )
@@ -237,14 +258,13 @@ if __name__ == "__main__":
 
         with row3_1:
 
-            with open("data/" + location + "/processed/" + spray + "/results.json", "r") as read_file:
-                results_dict = json.load(read_file)
+            results_dict = load_results(location, spray)
 
-            mean_freeze_rate = df[
-                df.Discharge != 0
-            ].fountain_froze.mean() / (CONSTANTS["DT"] / 60)
-            fountain_duration = df[df.Discharge != 0].shape[0]
-            mean_melt_rate = df.melted.mean() / (CONSTANTS["DT"] / 60)
+            mean_freeze_rate = stats["fountain"]["fountain_froze_mean"] / (
+                CONSTANTS["DT"] / 60
+            )
+            fountain_duration = stats["fountain"]["runtime"]
+            mean_melt_rate = stats["fountain"]["melted_mean"] / (CONSTANTS["DT"] / 60)
             st.markdown(
                 """
             | Fountain | Estimation |
@@ -279,7 +299,7 @@ if __name__ == "__main__":
             | Melt-out date | %s |
             """
                 % (
-                    df["iceV"].max(),
+                    stats["describe"]["iceV"]["max"],
                     results_dict["M_water"] / 1000,
                     results_dict["M_sub"] / 1000,
                     results_dict["WUE"],
@@ -292,121 +312,314 @@ if __name__ == "__main__":
             st.error("Please select at least one option.")
         else:
             if "Validation" in display:
-
-                st.write("## Validation")
-                path = "data/" + location + "/figs/" + spray + "/Vol_Validation.png"
-                st.image(path)
+                with section_timer("Validation"):
+                    st.write("## Validation")
+                    path = "data/" + location + "/figs/" + spray + "/Vol_Validation.png"
+                    st.image(sized_image(path, FIGURE_WIDTH))
 
             if "Timelapse" in display:
-                st.write("## Timelapse")
-                if location == "schwarzsee19":
-                    url = "https://youtu.be/GhljRBGpxMg"
-                    st.video(url)
-                elif location == "guttannen21":
-                    url = "https://www.youtube.com/watch?v=kXi4abO4YVM"
-                    st.video(url)
-                elif location == "guttannen20":
-                    url = "https://youtu.be/kcrvhU20OOE"
-                    st.video(url)
-                elif location == "gangles21":
-                    st.error("No Timelapse recorded")
-                elif location == "guttannen22":
-                    st.error("No Timelapse recorded")
+                with section_timer("Timelapse"):
+                    st.write("## Timelapse")
+                    if location == "schwarzsee19":
+                        url = "https://youtu.be/GhljRBGpxMg"
+                        st.video(url)
+                    elif location == "guttannen21":
+                        url = "https://www.youtube.com/watch?v=kXi4abO4YVM"
+                        st.video(url)
+                    elif location == "guttannen20":
+                        url = "https://youtu.be/kcrvhU20OOE"
+                        st.video(url)
+                    elif location == "gangles21":
+                        st.error("No Timelapse recorded")
+                    elif location == "guttannen22":
+                        st.error("No Timelapse recorded")
 
             if "Data Overview" in display:
-                st.write("## Input variables")
-                st.image("data/" + location + "/figs/Model_Input.png")
-                st.write(
+                with section_timer("Data Overview"):
+                    st.write("## Input variables")
+                    st.image(sized_image("data/" + location + "/figs/Model_Input.png", FIGURE_WIDTH))
+                    st.write(
+                        """
+                    Measurements at the AWS of %s were used as main model input
+                    data in 15 minute frequency.  Incoming shortwave and longwave radiation
+                    were obtained from ERA5 reanalysis dataset. Several data gaps
+                    and errors were also filled from the ERA5 dataset (shaded regions).  
                     """
-                Measurements at the AWS of %s were used as main model input
-                data in 15 minute frequency.  Incoming shortwave and longwave radiation
-                were obtained from ERA5 reanalysis dataset. Several data gaps
-                and errors were also filled from the ERA5 dataset (shaded regions).  
-                """
-                    % (location)
-                )
-                st.write("## Output variables")
-                st.image("data/" + location + "/figs/Model_Output.png")
-                st.write(
+                        % (location)
+                    )
+                    st.write("## Output variables")
+                    st.image(sized_image("data/" + location + "/figs/Model_Output.png", FIGURE_WIDTH))
+                    st.write(
+                        """
+                    (a) Fountain discharge (b) energy flux components, (c) mass flux components (d)
+                    surface area and (e) volume of the Icestupa in daily time steps. qSW is the net
+                    shortwave radiation; qLW is the net longwave radiation; qL and qS are the
+                    turbulent latent and sensible heat fluxes. qF represents the interactions of
+                    the ice-water boundary during fountain on time steps. qG quantifies the heat
+                    conduction process between the Icestupa surface layer and the ice body.
                     """
-                (a) Fountain discharge (b) energy flux components, (c) mass flux components (d)
-                surface area and (e) volume of the Icestupa in daily time steps. qSW is the net
-                shortwave radiation; qLW is the net longwave radiation; qL and qS are the
-                turbulent latent and sensible heat fluxes. qF represents the interactions of
-                the ice-water boundary during fountain on time steps. qG quantifies the heat
-                conduction process between the Icestupa surface layer and the ice body.
-                """
-                )
-
-            df = pd.read_hdf(FOLDER["output"] + spray + "/output" + ".h5", "df")
+                    )
 
             if "Input" in display:
-                st.write("## Input variables")
-                variable1 = st.multiselect(
-                    "Choose",
-                    options=(input_cols),
-                    default=["Discharge", "Temperature"],
-                    # default=["Temperature"],
-                )
-                if not (variable1):
-                    st.error("Please select at least one variable.")
-                else:
-                    variable_in = [input_vars[input_cols.index(item)] for item in variable1]
-                    variable = variable_in
-                    for v in variable:
-
-                        meta = get_parameter_metadata(v)
-                        st.header("%s" % (meta["name"] + " " + meta["units"]))
-                        row4_1, row4_2 = st.columns((2, 5))
-                        with row4_1:
-                            st.write(df[v].describe())
-                        with row4_2:
-                            st.line_chart(df[v], use_container_width=True)
+                with section_timer("Input"):
+                    st.write("## Input variables")
+                    variable1 = st.multiselect(
+                        "Choose",
+                        options=(input_cols),
+                        default=["Discharge", "Temperature"],
+                        # default=["Temperature"],
+                    )
+                    if not (variable1):
+                        st.error("Please select at least one variable.")
+                    else:
+                        variable_in = [input_vars[input_cols.index(item)] for item in variable1]
+                        variable = variable_in
+                        for v in variable:
+
+                            meta = get_parameter_metadata(v)
+                            st.header("%s" % (meta["name"] + " " + meta["units"]))
+                            row4_1, row4_2 = st.columns((2, 5))
+                            with row4_1:
+                                st.write(describe(location, spray, v, start, end))
+                            with row4_2:
+                                st.line_chart(
+                                    chart_series(location, spray, v, start=start, end=end),
+                                    use_container_width=True,
+                                )
+                            if aws_new:
+                                new_rows = load_live(location, start=pd.Timestamp(stats["end"]) + pd.Timedelta(hours=1))
+                                if v in new_rows:
+                                    st.write("AWS data since the last model run")
+                                    row5_1, row5_2 = st.columns((2, 5))
+                                    with row5_1:
+                                        st.write("All ingested AWS data")
+                                        st.write(live_stats(location)[v])
+                                    with row5_2:
+                                        st.line_chart(new_rows.set_index("time")[v], use_container_width=True)
+                                        st.write("Daily %s of the ingested AWS data" % aggregation(v))
+                                        st.line_chart(live_daily(location)[v], use_container_width=True)
 
             if "Output" in display:
-                st.write("## Output variables")
+                with section_timer("Output"):
+                    st.write("## Output variables")
 
-                variable2 = st.multiselect(
-                    "Choose",
-                    options=(output_cols),
-                    default=["Frozen Discharge"],
-                )
-                if not (variable2):
-                    st.error("Please select at least one variable.")
-                else:
-                    variable_out = [
-                        output_vars[output_cols.index(item)] for item in variable2
-                    ]
-                    variable = variable_out
-                    for v in variable:
-                        meta = get_parameter_metadata(v)
-                        st.header("%s" % (meta["name"] + " " + meta["units"]))
-                        row5_1, row5_2 = st.columns((2, 5))
-                        with row5_1:
-                            st.write(df[v].describe())
-                        with row5_2:
-                            st.line_chart(df[v], use_container_width=True)
+                    variable2 = st.multiselect(
+                        "Choose",
+                        options=(output_cols),
+                        default=["Frozen Discharge"],
+                    )
+                    if not (variable2):
+                        st.error("Please select at least one variable.")
+                    else:
+                        variable_out = [
+                            output_vars[output_cols.index(item)] for item in variable2
+                        ]
+                        variable = variable_out
+                        for v in variable:
+                            meta = get_parameter_metadata(v)
+                            st.header("%s" % (meta["name"] + " " + meta["units"]))
+                            row5_1, row5_2 = st.columns((2, 5))
+                            with row5_1:
+                                st.write(describe(location, spray, v, start, end))
+                            with row5_2:
+                                st.line_chart(
+                                    chart_series(location, spray, v, start=start, end=end),
+                                    use_container_width=True,
+                                )
 
             if "Derived" in display:
-                st.write("## Derived variables")
-                variable3 = st.multiselect(
-                    "Choose",
-                    options=(derived_cols),
-                    default=["Solar Surface Area Fraction"],
-                )
-                if not (variable3):
-                    st.error("Please select at least one variable.")
-
-                else:
-                    variable_in = [
-                        derived_vars[derived_cols.index(item)] for item in variable3
-                    ]
-                    variable = variable_in
-                    for v in variable:
-                        meta = get_parameter_metadata(v)
-                        st.header("%s" % (meta["name"] + " " + meta["units"]))
-                        row6_1, row6_2 = st.columns((2, 5))
-                        with row6_1:
-                            st.write(df[v].describe())
-                        with row6_2:
-                            st.line_chart(df[v], use_container_width=True)
+                with section_timer("Derived"):
+                    st.write("## Derived variables")
+                    variable3 = st.multiselect(
+                        "Choose",
+                        options=(derived_cols),
+                        default=["Solar Surface Area Fraction"],
+                    )
+                    if not (variable3):
+                        st.error("Please select at least one variable.")
+
+                    else:
+                        variable_in = [
+                            derived_vars[derived_cols.index(item)] for item in variable3
+                        ]
+                        variable = variable_in
+                        for v in variable:
+                            meta = get_parameter_metadata(v)
+                            st.header("%s" % (meta["name"] + " " + meta["units"]))
+                            row6_1, row6_2 = st.columns((2, 5))
+                            with row6_1:
+                                st.write(describe(location, spray, v, start, end))
+                            with row6_2:
+                                st.line_chart(
+                                    chart_series(location, spray, v, start=start, end=end),
+                                    use_container_width=True,
+                                )
+
+            if "Calibration" in display:
+                with section_timer("Calibration"):
+                    st.write("## Calibration")
+                    runs = loo_runs(location)
+                    if not runs:
+                        st.error("No calibration runs")
+                    else:
+                        run = st.selectbox(
+                            "Leave-one-out cross validation of",
+                            options=runs,
+                            format_func=lambda run: run.replace("-", " "),
+                        )
+                        grid = load_loo(location, run)
+                        ranges = {}
+                        for parameter in parameters(grid):
+                            meta = get_parameter_metadata(parameter)
+                            values = sorted(grid[parameter].unique())
+                            ranges[parameter] = st.select_slider(
+                                "%s %s" % (meta["name"], meta["units"]),
+                                options=values,
+                                value=(values[0], values[-1]),
+                            )
+                        sliced = select(grid, **ranges)
+                        if sliced.empty:
+                            st.error("No runs in this range.")
+                        else:
+                            row7_1, row7_2 = st.columns((2, 5))
+                            with row7_1:
+                                st.write("Lowest RMSE")
+                                st.write(best(sliced, k=10))
+                                st.write("Closest to the calibrated DX of %s m" % SITE["DX"])
+                                st.write(nearest(sliced, k=3, DX=SITE["DX"]))
+                            with row7_2:
+                                st.line_chart(
+                                    sliced.groupby("DX").rmse.min(),
+                                    use_container_width=True,
+                                )
+
+            if "Uncertainty" in display:
+                with section_timer("Uncertainty"):
+                    st.write("## Uncertainty")
+                    names = ensembles(location)
+                    if not names:
+                        st.error("No uncertainty simulations")
+                    else:
+                        name = st.selectbox("Ensemble", options=names)
+                        st.write(
+                            "Ice volume [$m^3$] of the model runs with uncertain %s"
+                            % ", ".join(uncertain_parameters(location, name))
+                        )
+                        ensemble = ensemble_stats(location, name, start=start, end=end)
+                        ensemble = chart_frame(location, spray, ensemble)
+                        row8_1, row8_2 = st.columns((5, 2))
+                        with row8_1:
+                            st.write("Prediction interval")
+                            st.line_chart(
+                                ensemble[["percentile_5", "mean", "percentile_95"]],
+                                use_container_width=True,
+                            )
+                        with row8_2:
+                            st.write("Variance")
+                            st.line_chart(ensemble.variance, use_container_width=True)
+
+                    if os.path.exists("data/" + location + "/processed/simulations/auto_sims.nc"):
+                        st.write("### Maximum freezing rate [$l/min$]")
+                        axes = freezing_rate_axes(location)
+                        humidities = [int(rh) for rh in axes["rh"]]
+                        winds = [int(v) for v in axes["v"]]
+                        rh = st.select_slider(
+                            "Relative Humidity [%]", options=humidities, value=humidities[len(humidities) // 2]
+                        )
+                        v = st.select_slider("Wind Speed [m/s]", options=winds, value=winds[len(winds) // 2])
+                        st.line_chart(freezing_rate(location, rh=rh, v=v), use_container_width=True)
+
+            if "What-if" in display:
+                with section_timer("What-if"):
+                    st.write("## What-if")
+                    st.write(
+                        "Energy and mass fluxes of the calibrated run recomputed for other constants, "
+                        "keeping its surface temperature and area."
+                    )
+                    base = calibrated(location, spray)
+                    constants = {}
+                    for constant in WHATIF_CONSTANTS:
+                        meta = get_parameter_metadata(constant)
+                        low, high, step = slider_range(constant, base[constant])
+                        constants[constant] = st.slider(
+                            "%s %s" % (meta["name"], meta["units"]),
+                            min_value=low,
+                            max_value=high,
+                            value=float(base[constant]),
+                            step=step,
+                        )
+                    calibrated_run = what_if(location, spray)
+                    changed_run = what_if(location, spray, **constants)
+                    row9_1, row9_2 = st.columns((2, 5))
+                    with row9_1:
+                        st.write(
+                            pd.DataFrame(
+                                {
+                                    "Calibrated": totals(calibrated_run[start:end]),
+                                    "What-if": totals(changed_run[start:end]),
+                                }
+                            )
+                        )
+                    with row9_2:
+                        fluxes = pd.DataFrame(
+                            {"Calibrated": calibrated_run.Qtotal, "What-if": changed_run.Qtotal}
+                        )[start:end]
+                        meta = get_parameter_metadata("Qtotal")
+                        st.write("%s %s" % (meta["name"], meta["units"]))
+                        st.line_chart(
+                            chart_frame(location, spray, fluxes),
+                            use_container_width=True,
+                        )
+                        mass = pd.DataFrame(
+                            {
+                                "Frozen": changed_run.fountain_froze - calibrated_run.fountain_froze,
+                                "Melted": changed_run.melted - calibrated_run.melted,
+                            }
+                        )[start:end].cumsum()
+                        st.write("Change in frozen and melted ice [$kg$]")
+                        st.line_chart(
+                            chart_frame(location, spray, mass),
+                            use_container_width=True,
+                        )
+
+            if "Discharge" in display:
+                with section_timer("Discharge"):
+                    st.write("## Fountain discharge")
+                    sites = fitted()
+                    if location not in sites:
+                        st.error("No discharge model fitted")
+                    else:
+                        st.write(
+                            "Discharge [$l\\,min^{-1}$] of the fountain run by hand and by the "
+                            "automatic strategy, against the discharge modelled from the weather"
+                        )
+                        discharge = season_discharge(location, spray)[["Observed"]].rename(
+                            columns={"Observed": "Manual"}
+                        )
+                        if os.path.exists("data/" + location + "/processed/auto/output.h5"):
+                            discharge["Automatic"] = season_discharge(location, "auto").Observed
+                        discharge["Modelled"] = season_discharge(location, spray).Modelled
+                        discharge = discharge[start:end]
+                        st.line_chart(
+                            chart_frame(location, spray, discharge),
+                            use_container_width=True,
+                        )
+
+                        st.write("### Modelled discharge of every site")
+                        row10_1, row10_2, row10_3 = st.columns((1, 1, 1))
+                        with row10_1:
+                            rh = st.slider("Relative Humidity [%]", 0, 100, 50, 5, key="discharge_rh")
+                        with row10_2:
+                            wind = st.slider("Wind Speed [m/s]", 0, 10, 2, key="discharge_wind")
+                        with row10_3:
+                            hour = st.slider("Hour of the day", 0, 23, 12)
+                        curves = discharge_curves(sites, range(-20, 11), rh=rh, wind=wind, hour=hour)
+                        st.line_chart(
+                            curves.rename(columns=lambda site: SITES[site]["title"]),
+                            use_container_width=True,
+                        )
+
+
+if __name__ == "__main__":
+    with profile_rerun():
+        main()
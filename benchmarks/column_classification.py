@@ -0,0 +1,62 @@
+"""Per-rerun cost of classifying dataset columns into Input/Output/Derived
+
+Compares the former @st.cache wrapped vars(df), which hashes the whole frame on
+every rerun, against the key based utils.data.classify_columns.
+
+Run from the repository root:
+    python benchmarks/column_classification.py
+"""
+
+# External modules
+import os, sys
+import timeit
+import streamlit as st
+
+dirname = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(dirname)
+os.chdir(dirname)
+
+from utils.data import load_output, classify_columns
+from utils.metadata import get_parameter_metadata
+
+LOCATIONS = ["guttannen20", "guttannen21", "guttannen22", "gangles21"]
+
+
+@st.cache
+def vars(df):
+    input_cols = []
+    input_vars = []
+    output_cols = []
+    output_vars = []
+    derived_cols = []
+    derived_vars = []
+    for variable in df.columns:
+        v = get_parameter_metadata(variable)
+        if v["kind"] == "Input":
+            input_cols.append(v["name"])
+            input_vars.append(variable)
+        if v["kind"] == "Output":
+            output_cols.append(v["name"])
+            output_vars.append(variable)
+        if v["kind"] == "Derived":
+            derived_cols.append(v["name"])
+            derived_vars.append(variable)
+    return input_cols, input_vars, output_cols, output_vars, derived_cols, derived_vars
+
+
+def best_of(stmt, number=20, repeat=5):
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+if __name__ == "__main__":
+    spray = "man"
+    print("%-12s %6s %14s %14s" % ("location", "rows", "st.cache [ms]", "keyed [ms]"))
+    for location in LOCATIONS:
+        df = load_output(location, spray)
+        assert vars(df) == classify_columns(location, spray, df)
+        before = best_of(lambda: vars(df))
+        after = best_of(lambda: classify_columns(location, spray, df))
+        print(
+            "%-12s %6i %14.3f %14.3f"
+            % (location, df.shape[0], before * 1000, after * 1000)
+        )
@@ -0,0 +1,60 @@
+"""Load time and memory of the Parquet column projection against pd.read_hdf
+
+Reads Discharge and temp (plus time) of every site, once through the full
+output.h5 frame and once from the Parquet store. Nothing is cached.
+
+Run from the repository root:
+    python benchmarks/columnar_store.py
+
+Sample output (man spray, warm page cache):
+
+    location     read_hdf [ms]  parquet [ms]  read_hdf [kB]  parquet [kB]
+    guttannen20            7.8           3.5           880            52
+    guttannen21            8.7           3.5          1579            94
+    guttannen22            6.5           3.5           523            30
+    gangles21              9.3           3.8          1463            86
+"""
+
+# External modules
+import os, sys
+import timeit
+import pandas as pd
+
+dirname = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(dirname)
+os.chdir(dirname)
+
+from utils.data import frame_nbytes, output_path
+from utils.store import convert, is_current, read_columns
+
+LOCATIONS = ["guttannen20", "guttannen21", "guttannen22", "gangles21"]
+COLUMNS = ["Discharge", "temp"]
+
+
+def best_of(stmt, number=10, repeat=5):
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+if __name__ == "__main__":
+    spray = "man"
+    print(
+        "%-12s %13s %13s %14s %13s"
+        % ("location", "read_hdf [ms]", "parquet [ms]", "read_hdf [kB]", "parquet [kB]")
+    )
+    for location in LOCATIONS:
+        if not is_current(location, spray):
+            convert(location, spray)
+        path = output_path(location, spray)
+        full = pd.read_hdf(path, "df")
+        projected = read_columns(location, spray, COLUMNS)
+        assert projected.equals(full[["time"] + COLUMNS])
+        print(
+            "%-12s %13.1f %13.1f %14i %13i"
+            % (
+                location,
+                best_of(lambda: pd.read_hdf(path, "df")) * 1000,
+                best_of(lambda: read_columns(location, spray, COLUMNS)) * 1000,
+                frame_nbytes(full) / 1024,
+                frame_nbytes(projected) / 1024,
+            )
+        )
@@ -0,0 +1,91 @@
+"""Time to first paint of a freshly started app server
+
+Starts `streamlit run app.py` on a free local port, connects one session and
+times the first rerun of Home and then of a site: until the first delta
+reaches the browser (first paint) and until the script finished.
+
+Run from the repository root:
+    python benchmarks/first_paint.py --trials 5
+"""
+
+# External modules
+import os, sys
+import argparse
+import asyncio
+import socket
+import statistics
+import subprocess
+import time
+import urllib.request
+
+dirname = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
+os.chdir(dirname)
+
+from load_test import Session
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_healthy(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url + "/healthz", timeout=1)
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError("Server did not start")
+
+
+async def visit(url, site):
+    session = Session(url)
+    await session.connect()
+    try:
+        await session.rerun()
+        session.choose(" ", site, option="Home")
+        await session.rerun()
+    finally:
+        session.close()
+    return session
+
+
+def trial(site):
+    port = free_port()
+    url = "http://127.0.0.1:%i" % port
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py", "--server.headless", "true", "--server.port", str(port)],
+        env=dict(os.environ, AIR_METRICS_PORT="0"),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_healthy(url)
+        session = asyncio.run(visit(url, site))
+    finally:
+        server.terminate()
+        server.wait()
+    return session.first_deltas, session.latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--site", default="Gangles 2021")
+    args = parser.parse_args()
+
+    runs = [trial(args.site) for _ in range(args.trials)]
+    print("%-14s %16s %16s" % ("page", "first paint [ms]", "finished [ms]"))
+    for i, page in enumerate(["Home", args.site]):
+        print(
+            "%-14s %16.0f %16.0f"
+            % (
+                page,
+                1000 * statistics.median(first[i] for first, _ in runs),
+                1000 * statistics.median(finished[i] for _, finished in runs),
+            )
+        )
@@ -0,0 +1,35 @@
+"""Resident bytes of every processed output frame with and without compact mode
+
+Run from the repository root:
+    python benchmarks/frame_memory.py
+"""
+
+# External modules
+import os, sys
+import glob
+import pandas as pd
+
+dirname = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(dirname)
+os.chdir(dirname)
+
+from utils.data import compact_frame, frame_nbytes
+
+
+if __name__ == "__main__":
+    print("%-12s %-10s %12s %12s %7s" % ("location", "spray", "full [kB]", "compact [kB]", "ratio"))
+    total = [0, 0]
+    for path in sorted(glob.glob("data/*/processed/*/output.h5")):
+        location, spray = path.split(os.sep)[1], path.split(os.sep)[3]
+        df = pd.read_hdf(path, "df")
+        before, after = frame_nbytes(df), frame_nbytes(compact_frame(df))
+        total[0] += before
+        total[1] += after
+        print(
+            "%-12s %-10s %12i %12i %7.2f"
+            % (location, spray, before / 1024, after / 1024, after / before)
+        )
+    print(
+        "%-12s %-10s %12i %12i %7.2f"
+        % ("total", "", total[0] / 1024, total[1] / 1024, total[1] / total[0])
+    )
@@ -0,0 +1,188 @@
+"""Concurrent session load generator for a locally running app
+
+Opens many simulated browser sessions on the Streamlit websocket of a server
+started with `streamlit run app.py` and walks each through a scripted journey:
+load Home, pick a site, toggle the Input, Output and Derived sections and
+change their variables. Reports p50/p95/p99 rerun latency, throughput and the
+server RSS growth read from the metrics endpoint.
+
+Run from the repository root while the app is served on localhost:
+    python benchmarks/load_test.py --sessions 30 --output load.json
+"""
+
+# External modules
+import sys, json
+import argparse
+import asyncio
+import random
+import time
+import urllib.request
+import numpy as np
+from tornado.websocket import websocket_connect
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+LOCATIONS = ["Guttannen 2020", "Guttannen 2021", "Guttannen 2022", "Gangles 2021"]
+DISPLAY_LABEL = "Choose type of web below:"
+
+
+class Session:
+    """One simulated browser tab speaking the Streamlit websocket protocol"""
+
+    def __init__(self, url):
+        self.url = url.replace("http", "ws", 1).rstrip("/") + "/stream"
+        self.widgets = {}
+        self.states = {}
+        self.latencies = []
+        self.first_deltas = []
+        self.errors = 0
+
+    async def connect(self):
+        self.connection = await websocket_connect(self.url, max_message_size=2**28)
+
+    def close(self):
+        self.connection.close()
+
+    async def rerun(self):
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        for widget_id, (kind, value) in self.states.items():
+            state = msg.rerun_script.widget_states.widgets.add()
+            state.id = widget_id
+            if kind == "radio":
+                state.int_value = value
+            else:
+                state.int_array_value.data.extend(value)
+
+        start = time.perf_counter()
+        await self.connection.write_message(msg.SerializeToString(), binary=True)
+        widgets = []
+        while True:
+            payload = await self.connection.read_message()
+            if payload is None:
+                raise ConnectionError("Server closed the session")
+            forward = ForwardMsg()
+            forward.ParseFromString(payload)
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and len(self.first_deltas) < len(self.latencies) + 1:
+                self.first_deltas.append(time.perf_counter() - start)
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                if element.WhichOneof("type") in ("radio", "multiselect"):
+                    widgets.append((element.WhichOneof("type"), getattr(element, element.WhichOneof("type"))))
+            elif kind == "report_finished":
+                if forward.report_finished != ForwardMsg.FINISHED_SUCCESSFULLY:
+                    self.errors += 1
+                break
+        self.latencies.append(time.perf_counter() - start)
+        self.widgets = {}
+        for kind, widget in widgets:
+            self.widgets.setdefault(widget.label, []).append((kind, widget))
+
+    def find(self, label, option=None):
+        for kind, widget in self.widgets.get(label, []):
+            if option is None or option in widget.options:
+                return kind, widget
+        return None, None
+
+    def choose(self, label, values, option=None):
+        kind, widget = self.find(label, option)
+        if widget is None:
+            return False
+        if kind == "radio":
+            self.states[widget.id] = (kind, list(widget.options).index(values))
+        else:
+            self.states[widget.id] = (kind, [list(widget.options).index(v) for v in values])
+        return True
+
+
+async def journey(session, rng, think):
+    await session.connect()
+    try:
+        await session.rerun()
+        session.choose(" ", rng.choice(LOCATIONS), option="Home")
+        await session.rerun()
+        display = ["Validation"]
+        for section in ["Input", "Output", "Derived"]:
+            display.append(section)
+            session.choose(DISPLAY_LABEL, display)
+            await session.rerun()
+            await asyncio.sleep(rng.uniform(0, think))
+        for section_option in ["Temperature", "Frozen Discharge", "Solar Surface Area Fraction"]:
+            kind, widget = session.find("Choose", section_option)
+            if widget is not None:
+                options = list(widget.options)
+                session.choose("Choose", rng.sample(options, rng.randint(1, min(3, len(options)))), section_option)
+                await session.rerun()
+                await asyncio.sleep(rng.uniform(0, think))
+    finally:
+        session.close()
+
+
+def server_rss(metrics_url):
+    try:
+        body = urllib.request.urlopen(metrics_url, timeout=5).read().decode()
+    except OSError:
+        return None
+    for line in body.splitlines():
+        if line.startswith("process_resident_memory_bytes"):
+            return float(line.split()[-1])
+    return None
+
+
+async def run(url, sessions, ramp, think, seed):
+    rng = random.Random(seed)
+    simulated = [Session(url) for _ in range(sessions)]
+
+    async def start(i, session):
+        await asyncio.sleep(i * ramp)
+        try:
+            await journey(session, random.Random(rng.random()), think)
+        except (OSError, ConnectionError) as e:
+            session.errors += 1
+            print("session %i failed: %s" % (i, e), file=sys.stderr)
+
+    begin = time.perf_counter()
+    await asyncio.gather(*(start(i, session) for i, session in enumerate(simulated)))
+    return simulated, time.perf_counter() - begin
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8501", help="Streamlit server")
+    parser.add_argument("--metrics-url", default="http://127.0.0.1:9101/metrics", help="Prometheus endpoint of the server")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--ramp", type=float, default=0.1, help="Seconds between session starts")
+    parser.add_argument("--think", type=float, default=0.5, help="Maximum pause between clicks [s]")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file with the results")
+    args = parser.parse_args()
+
+    rss_before = server_rss(args.metrics_url)
+    sessions, seconds = asyncio.run(run(args.url, args.sessions, args.ramp, args.think, args.seed))
+    rss_after = server_rss(args.metrics_url)
+
+    latencies = np.array([latency for session in sessions for latency in session.latencies])
+    results = dict(
+        sessions=args.sessions,
+        reruns=len(latencies),
+        errors=sum(session.errors for session in sessions),
+        seconds=seconds,
+        throughput=len(latencies) / seconds,
+        p50=float(np.percentile(latencies, 50)) if len(latencies) else None,
+        p95=float(np.percentile(latencies, 95)) if len(latencies) else None,
+        p99=float(np.percentile(latencies, 99)) if len(latencies) else None,
+        rss_before=rss_before,
+        rss_after=rss_after,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+    print("sessions    %i" % results["sessions"])
+    print("reruns      %i (%i errors)" % (results["reruns"], results["errors"]))
+    print("throughput  %.1f reruns/s" % results["throughput"])
+    if len(latencies):
+        print("latency     p50 %.0f ms, p95 %.0f ms, p99 %.0f ms" % tuple(1000 * results[p] for p in ("p50", "p95", "p99")))
+    if rss_before is not None and rss_after is not None:
+        print("server RSS  %.0f MB -> %.0f MB" % (rss_before / 2**20, rss_after / 2**20))
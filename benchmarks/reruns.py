@@ -0,0 +1,162 @@
+"""Headless rerun latency, peak memory and chart bytes of app.py
+
+Runs the app script in Streamlit's bare mode for every entry of the location
+radio and every combination of the display multiselect. Widgets are answered
+by the harness, everything else keeps its default. Each case is run cold,
+with every SharedCache cleared, and then warm.
+
+Chart bytes are the Arrow serialisation of the data handed to st.line_chart.
+Peak memory is the tracemalloc peak of a third, cold rerun; tracing slows
+the app down severalfold, so the timed reruns run untraced.
+
+Run from the repository root:
+    python benchmarks/reruns.py --output reruns.json
+"""
+
+# External modules
+import os, sys, json
+import argparse
+import itertools
+import runpy
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+import streamlit as st
+from streamlit.delta_generator import DeltaGenerator
+from streamlit.type_util import convert_anything_to_df, data_frame_to_bytes
+
+dirname = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(dirname)
+os.chdir(dirname)
+# Cold reruns must not be warmed behind the harness' back
+os.environ["AIR_PREFETCH"] = "0"
+
+from utils.cache import CACHES
+
+LOCATIONS = ["Home", "Guttannen 2020", "Guttannen 2021", "Guttannen 2022", "Gangles 2021"]
+DISPLAY = ["Timelapse", "Validation", "Data Overview", "Input", "Output", "Derived", "Calibration", "Uncertainty", "What-if", "Discharge"]
+
+
+def combinations(options):
+    for n in range(len(options) + 1):
+        for combination in itertools.combinations(options, n):
+            yield list(combination)
+
+
+class Harness:
+    """Answers the location radio and display multiselect, records charts"""
+
+    def __init__(self):
+        self.location = LOCATIONS[0]
+        self.display = []
+        self.chart_bytes = []
+        self._radio = DeltaGenerator.radio
+        self._multiselect = st.multiselect
+        self._line_chart = st.line_chart
+
+    def radio(self, dg, label, options, *args, **kwargs):
+        if self.location in options:
+            return self.location
+        return self._radio(dg, label, options, *args, **kwargs)
+
+    def multiselect(self, label, options, *args, **kwargs):
+        if label.startswith("Choose type"):
+            return list(self.display)
+        return self._multiselect(label, options, *args, **kwargs)
+
+    def line_chart(self, data=None, *args, **kwargs):
+        self.chart_bytes.append(len(data_frame_to_bytes(convert_anything_to_df(data))))
+        return self._line_chart(data, *args, **kwargs)
+
+    def __enter__(self):
+        harness = self
+        DeltaGenerator.radio = lambda dg, *args, **kwargs: harness.radio(dg, *args, **kwargs)
+        st.multiselect = self.multiselect
+        st.line_chart = self.line_chart
+        return self
+
+    def __exit__(self, *exc):
+        DeltaGenerator.radio = self._radio
+        st.multiselect = self._multiselect
+        st.line_chart = self._line_chart
+
+    def rerun(self):
+        self.chart_bytes = []
+        start = time.perf_counter()
+        error = None
+        try:
+            runpy.run_path("app.py", run_name="__main__")
+        except Exception as e:
+            error = "%s: %s" % (type(e).__name__, e)
+        seconds = time.perf_counter() - start
+        return dict(seconds=seconds, chart_bytes=self.chart_bytes, error=error)
+
+    def peak_bytes(self):
+        """tracemalloc peak of one rerun, not timed"""
+        tracemalloc.start()
+        try:
+            self.rerun()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def clear_caches():
+    for cache in CACHES.values():
+        cache.clear()
+
+
+def run(locations, displays):
+    cases = []
+    with Harness() as harness:
+        for location in locations:
+            for display in displays if location != "Home" else [[]]:
+                harness.location = location
+                harness.display = display
+                clear_caches()
+                cold = harness.rerun()
+                warm = harness.rerun()
+                clear_caches()
+                peak = harness.peak_bytes()
+                cases.append(dict(location=location, display=display, cold=cold, warm=warm, peak_bytes=peak))
+    return cases
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="reruns.json", help="JSON file with the results")
+    parser.add_argument("--location", action="append", choices=LOCATIONS, help="Repeat to pick several")
+    parser.add_argument("--single", action="store_true", help="Each display option alone, not every combination")
+    args = parser.parse_args()
+
+    displays = [[option] for option in DISPLAY] if args.single else list(combinations(DISPLAY))
+    cases = run(args.location or LOCATIONS, displays)
+    with open(args.output, "w") as f:
+        json.dump(
+            dict(commit=git_commit(), date=datetime.now().isoformat(), cases=cases),
+            f,
+            indent=4,
+        )
+
+    print("%-16s %6s %10s %10s %12s %8s" % ("location", "cases", "cold [ms]", "warm [ms]", "peak [MB]", "errors"))
+    for location in args.location or LOCATIONS:
+        runs = [case for case in cases if case["location"] == location]
+        print(
+            "%-16s %6i %10.1f %10.1f %12.1f %8i"
+            % (
+                location,
+                len(runs),
+                1000 * sum(case["cold"]["seconds"] for case in runs) / len(runs),
+                1000 * sum(case["warm"]["seconds"] for case in runs) / len(runs),
+                max(case["peak_bytes"] for case in runs) / 2**20,
+                sum(case["warm"]["error"] is not None for case in runs),
+            )
+        )
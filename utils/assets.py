@@ -0,0 +1,17 @@
+"""Static text and images of the web app, read once per process
+"""
+
+# External modules
+from functools import lru_cache
+from pathlib import Path
+
+
+@lru_cache(maxsize=None)
+def read_text(path):
+    return Path(path).read_text()
+
+
+@lru_cache(maxsize=None)
+def read_image(path):
+    """Image file contents, anything st.image accepts as bytes"""
+    return Path(path).read_bytes()
@@ -0,0 +1,78 @@
+"""Process-wide caches shared by all app sessions
+"""
+
+# External modules
+import threading
+from cachetools import LRUCache
+
+# Every named cache of the process, read by the metrics exporter
+CACHES = {}
+
+
+class SharedCache:
+    """Thread-safe LRU cache with an optional size budget and hit/miss counters.
+
+    Streamlit imports this module once per server process, so every session
+    reads from the same instance. Concurrent misses on the same key wait for
+    the first loader instead of decoding the file twice.
+    """
+
+    def __init__(self, name, maxsize, getsizeof=None):
+        self.name = name
+        self._cache = LRUCache(maxsize=maxsize, getsizeof=getsizeof)
+        self._lock = threading.Lock()
+        self._loading = {}
+        self.hits = 0
+        self.misses = 0
+        CACHES[name] = self
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._cache
+
+    def get(self, key, loader):
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._cache:
+                    return self._cache[key]
+            try:
+                value = loader()
+                with self._lock:
+                    try:
+                        self._cache[key] = value
+                    except ValueError:
+                        # Larger than the whole budget, serve it uncached
+                        pass
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+        return value
+
+    def invalidate(self, match):
+        """Drop every entry whose key satisfies match(key)"""
+        with self._lock:
+            stale = [key for key in self._cache.keys() if match(key)]
+            for key in stale:
+                del self._cache[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                entries=len(self._cache),
+                currsize=self._cache.currsize,
+                maxsize=self._cache.maxsize,
+            )
@@ -0,0 +1,84 @@
+"""Parameter grids of the leave-one-out cross validation runs
+"""
+
+# External modules
+import os
+import ast
+import numpy as np
+import pandas as pd
+from utils.cache import SharedCache
+
+CALIBRATION_CACHE = SharedCache("calibration", maxsize=32)
+
+# Calibrated parameters in the order of the grid columns
+LOO_PARAMETERS = ("DX", "Z", "SA_corr")
+LOO_PREFIX = "loo-cv-"
+
+
+def loo_dir(location):
+    return "data/" + location + "/processed/simulations/"
+
+
+def loo_runs(location):
+    """Names of the LOO-CV runs of a site, e.g. volume-Z-SA_corr-DX"""
+    try:
+        filenames = os.listdir(loo_dir(location))
+    except OSError:
+        return []
+    return sorted(f[len(LOO_PREFIX):] for f in filenames if f.startswith(LOO_PREFIX))
+
+
+def parse_loo(path):
+    """rmse,params rows as a float grid with one column per parameter, best first"""
+    raw = pd.read_csv(path)
+    # Literals only, never eval() the file
+    params = pd.DataFrame([ast.literal_eval(literal) for literal in raw.params])
+    columns = [parameter for parameter in LOO_PARAMETERS if parameter in params.columns]
+    grid = params[columns].astype("float64")
+    grid["rmse"] = raw.rmse.astype("float64").to_numpy()
+    return grid.sort_values("rmse", ignore_index=True)
+
+
+def load_loo(location, run):
+    """Parsed grid of one LOO-CV run, cached until the file changes"""
+    path = loo_dir(location) + LOO_PREFIX + run
+    key = (location, run, os.path.getmtime(path))
+
+    def parse():
+        CALIBRATION_CACHE.invalidate(lambda k: k[:2] == key[:2] and k != key)
+        return parse_loo(path)
+
+    return CALIBRATION_CACHE.get(key, parse)
+
+
+def parameters(grid):
+    return [column for column in grid.columns if column != "rmse"]
+
+
+def best(grid, k=5):
+    """The k parameter sets with the lowest rmse"""
+    # Grids are kept sorted by rmse
+    return grid.head(k)
+
+
+def nearest(grid, k=1, **values):
+    """The k rows closest to the given parameter values.
+
+    Distances are taken in units of each parameter's range over the grid, so
+    DX in metres and SA_corr as a factor weigh alike.
+    """
+    columns = [column for column in values if column in grid.columns]
+    points = grid[columns].to_numpy()
+    span = np.ptp(points, axis=0)
+    span[span == 0] = 1
+    target = np.array([values[column] for column in columns], dtype="float64")
+    distance = np.sqrt((((points - target) / span) ** 2).sum(axis=1))
+    return grid.iloc[np.argsort(distance, kind="stable")[:k]]
+
+
+def select(grid, **ranges):
+    """Rows with every given parameter inside its (low, high) range"""
+    mask = np.ones(len(grid), dtype=bool)
+    for column, (low, high) in ranges.items():
+        mask &= grid[column].between(low, high).to_numpy()
+    return grid[mask]
@@ -0,0 +1,106 @@
+"""Reduces time series to a point budget before they are sent to the browser
+"""
+
+# External modules
+import os
+import numpy as np
+import pandas as pd
+from utils.data import data_version, frame_cache, frame_nbytes, load_columns
+from utils.metrics import CHART_BYTES
+from utils.pyramid import LEVELS, choose_level, extremes, load_pyramid
+from utils.stats import load_stats
+
+# Points per chart, each bucket keeps its minimum and maximum
+CHART_POINTS = int(os.environ.get("AIR_CHART_POINTS", 1000))
+
+CHART_CACHE = frame_cache("charts")
+
+
+def extreme_positions(values, budget=CHART_POINTS):
+    """Positions of the minimum and maximum of budget / 2 equal buckets, in order"""
+    n = len(values)
+    bucket = np.arange(n) * (budget // 2) // n
+    nan = np.isnan(values)
+    lows = pd.Series(np.where(nan, np.inf, values)).groupby(bucket).idxmin()
+    highs = pd.Series(np.where(nan, -np.inf, values)).groupby(bucket).idxmax()
+    return np.union1d(lows.to_numpy(), highs.to_numpy())
+
+
+def decimate(series, budget=CHART_POINTS):
+    """Min/max bucketing of a series to at most budget points.
+
+    The series is split into budget / 2 equal buckets and the rows holding the
+    minimum and maximum of each bucket are kept in time order, so peaks such
+    as iceV maxima or Discharge spikes survive.
+    """
+    if len(series) <= budget or budget < 2:
+        return series
+    return series.iloc[extreme_positions(series.to_numpy(dtype=float), budget)]
+
+
+def decimate_frame(df, budget=CHART_POINTS):
+    """decimate() of every column of df, keeping the rows any column needs.
+
+    Each column gets an equal share of the budget, so the result has at most
+    budget rows.
+    """
+    if len(df) <= budget or budget < 2:
+        return df
+    share = max(2, budget // max(1, df.shape[1]))
+    positions = [extreme_positions(df[column].to_numpy(dtype=float), share) for column in df]
+    return df.iloc[np.unique(np.concatenate(positions))]
+
+
+def chart_frame(location, spray, df, budget=CHART_POINTS):
+    """decimate_frame() of data computed outside chart_series, recording its bytes"""
+    df = decimate_frame(df, budget)
+    CHART_BYTES.labels(location, spray).observe(frame_nbytes(df))
+    return df
+
+
+def hourly(location, spray, variable, start=None, end=None):
+    """Time indexed series of a variable at the model time step"""
+    return load_columns(location, spray, [variable], start, end).set_index("time")[variable]
+
+
+def chart_series(location, spray, variable, budget=CHART_POINTS, start=None, end=None):
+    """Time indexed series of a variable for st.line_chart.
+
+    Reads the finest level that covers the time window within the budget and
+    decimates whatever still exceeds it. Hourly windows come from the indexed
+    store so only the matching rows are read, coarser levels keep the minimum
+    and maximum of each bucket within the window. Cached per site, spray,
+    variable, budget and window.
+    """
+    key = (location, spray, data_version(location, spray), variable, budget, start, end)
+
+    def read():
+        CHART_CACHE.invalidate(lambda k: k[:2] == key[:2] and k[2] != key[2])
+        stats = load_stats(location, spray)
+        season = pd.Timestamp(stats["start"]), pd.Timestamp(stats["end"])
+        window = (
+            season[0] if start is None else max(season[0], pd.Timestamp(start)),
+            season[1] if end is None else min(season[1], pd.Timestamp(end)),
+        )
+        level = choose_level(window[1] - window[0], budget)
+        if level == LEVELS[0][0]:
+            return decimate(hourly(location, spray, variable, start, end), budget)
+        # Buckets cut by the window are rebuilt from its hourly rows, the
+        # stored extremes of such a bucket may lie outside the window
+        freq = dict(LEVELS)[level]
+        first, stop = window[0].ceil(freq), window[1].floor(freq)
+        head = hourly(location, spray, variable, window[0], min(first, window[1]))
+        tail = hourly(location, spray, variable, max(first, stop), window[1])
+        pyramid = load_pyramid(location, spray, variable)[level]
+        series = pd.concat(
+            [
+                extremes(head[head.index < first], freq),
+                pyramid[(pyramid.index >= first) & (pyramid.index < stop)],
+                extremes(tail, freq),
+            ]
+        )
+        return decimate(series, budget)
+
+    series = CHART_CACHE.get(key, read)
+    CHART_BYTES.labels(location, spray).observe(frame_nbytes(series))
+    return series
@@ -0,0 +1,192 @@
+"""Loads processed model outputs for the web app
+"""
+
+# External modules
+import os
+import logging
+import pandas as pd
+from utils.cache import SharedCache
+from utils.derived import DERIVED, INPUTS, derivable, evaluate
+from utils.store import convert, is_current, read_columns, read_schema, store_path
+from utils.metadata import classify_parameters, get_parameters_metadata
+from utils.metrics import LOAD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def frame_nbytes(df):
+    """Bytes held by a DataFrame or Series"""
+    usage = df.memory_usage(deep=True)
+    return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+
+
+# Bytes held by all frame caches together, split between them by FRAME_CACHE_SHARES
+FRAME_CACHE_BYTES = int(os.environ.get("AIR_FRAME_CACHE_MB", 32)) * 2**20
+FRAME_CACHE_SHARES = dict(frames=0.4, projections=0.2, derived=0.1, pyramid=0.15, charts=0.15)
+
+
+def frame_cache(name, getsizeof=frame_nbytes):
+    """SharedCache bounded by its share of FRAME_CACHE_BYTES"""
+    return SharedCache(
+        name, maxsize=int(FRAME_CACHE_BYTES * FRAME_CACHE_SHARES[name]), getsizeof=getsizeof
+    )
+
+
+# Shared by all sessions, bounded in bytes so the site datasets do not pile up
+FRAME_CACHE = frame_cache("frames")
+
+# Opt-in float32 and categorical frames, about half the bytes per site
+COMPACT_FRAMES = os.environ.get("AIR_COMPACT_FRAMES", "0") == "1"
+
+# Column projections read from the Parquet store
+PROJECTION_CACHE = frame_cache("projections")
+
+# Season series of derived variables, computed on first use
+DERIVED_CACHE = frame_cache("derived")
+
+# Empty frames with the columns and dtypes of each site output
+SCHEMA_CACHE = SharedCache("schemas", maxsize=64)
+
+
+def compact_frame(df, max_categories=0.5):
+    """Returns a copy of df with float32 instead of float64 columns and object
+    columns with few distinct values as categoricals. Rows are sorted by time
+    on a RangeIndex, time itself stays datetime64 (int64 nanoseconds).
+    """
+    df = df.sort_values("time", ignore_index=True)
+    floats = df.select_dtypes("float64").columns
+    df[floats] = df[floats].astype("float32")
+    for column in df.select_dtypes("object").columns:
+        if df[column].nunique() <= max_categories * len(df):
+            df[column] = df[column].astype("category")
+    return df
+
+
+def output_path(location, spray="man"):
+    return "data/" + location + "/processed/" + spray + "/output.h5"
+
+
+def data_version(location, spray="man"):
+    """Changes whenever output.h5 of the site is rewritten"""
+    return os.path.getmtime(output_path(location, spray))
+
+
+def load_output(location, spray="man"):
+    """Returns the processed output frame of a site.
+
+    Entries are keyed on the file mtime so a rewritten output.h5 is read
+    again. The returned frame is shared between sessions and must not be
+    modified in place.
+    """
+    path = output_path(location, spray)
+    key = (location, spray, data_version(location, spray))
+
+    def read():
+        FRAME_CACHE.invalidate(lambda k: k[:2] == key[:2] and k != key)
+        with LOAD_SECONDS.labels(location, spray, "h5").time():
+            df = pd.read_hdf(path, "df")
+        return compact_frame(df) if COMPACT_FRAMES else df
+
+    return FRAME_CACHE.get(key, read)
+
+
+def has_store(location, spray="man"):
+    """Converts a missing or outdated Parquet store, False if it cannot be written"""
+    if is_current(location, spray):
+        return True
+    try:
+        convert(location, spray)
+        return True
+    except OSError as e:
+        logger.warning("Parquet store unavailable for %s/%s: %s" % (location, spray, e))
+        return False
+
+
+def load_schema(location, spray="man"):
+    """Returns an empty frame with the columns and dtypes of the site output.
+
+    Cached until output.h5 changes, the frame is shared between sessions.
+    """
+    key = (location, spray, data_version(location, spray))
+
+    def read():
+        SCHEMA_CACHE.invalidate(lambda k: k[:2] == key[:2] and k != key)
+        if has_store(location, spray):
+            schema = read_schema(location, spray)
+            # Derived variables the store leaves out are still offered
+            missing = [v for v in derivable(schema.columns) if v not in schema.columns]
+            return schema.assign(**{v: pd.Series(dtype="float64") for v in missing})
+        return load_output(location, spray).iloc[:0]
+
+    return SCHEMA_CACHE.get(key, read)
+
+
+def load_derived(location, spray, variable):
+    """time and a derived variable over the whole season, from the Parquet store"""
+    key = (location, spray, os.path.getmtime(store_path(location, spray)), variable)
+
+    def compute():
+        DERIVED_CACHE.invalidate(lambda k: k[:2] == key[:2] and k[2] != key[2])
+        df = read_columns(location, spray, INPUTS[variable])
+        return pd.DataFrame({"time": df.time, variable: evaluate(df, variable)})
+
+    return DERIVED_CACHE.get(key, compute)
+
+
+def load_columns(location, spray, columns, start=None, end=None):
+    """Returns time and the given columns, reading only those from the Parquet store.
+
+    start and end restrict the rows to a time window, read through the row
+    group index of the store. Falls back to the cached output.h5 frame when no
+    store can be written. The returned frame is shared between sessions.
+    """
+    columns = tuple(column for column in columns if column != "time")
+    if not has_store(location, spray):
+        df = load_output(location, spray)
+        missing = {v: evaluate(df, v) for v in columns if v not in df.columns}
+        df = df.assign(**missing)[["time", *columns]]
+        if start is not None:
+            df = df[df.time >= start]
+        if end is not None:
+            df = df[df.time <= end]
+        return df
+
+    key = (location, spray, os.path.getmtime(store_path(location, spray)), columns, start, end)
+
+    def read():
+        PROJECTION_CACHE.invalidate(lambda k: k[:2] == key[:2] and k[2] != key[2])
+        stored = set(read_schema(location, spray).columns)
+        derived = [c for c in columns if c not in stored and c in DERIVED]
+        with LOAD_SECONDS.labels(location, spray, "parquet").time():
+            df = read_columns(location, spray, [c for c in columns if c not in derived], start, end)
+        for variable in derived:
+            # Accumulated variables need the whole season, cut to the window after
+            df = df.merge(load_derived(location, spray, variable), on="time", how="left")
+        df = df[["time", *columns]]
+        return compact_frame(df) if COMPACT_FRAMES else df
+
+    return PROJECTION_CACHE.get(key, read)
+
+
+# Column groups of each dataset, keyed without hashing the frame contents
+GROUPS_CACHE = SharedCache("groups", maxsize=64)
+
+
+def schema_fingerprint(df):
+    return tuple(zip(df.columns, map(str, df.dtypes)))
+
+
+def classify_columns(location, spray, df):
+    """Returns names and columns of the Input, Output and Derived variables of df"""
+
+    def classify():
+        groups = classify_parameters(df.columns)
+        input_vars = groups["Input"]
+        output_vars = groups["Output"]
+        derived_vars = groups["Derived"]
+        input_cols = [v["name"] for v in get_parameters_metadata(input_vars)]
+        output_cols = [v["name"] for v in get_parameters_metadata(output_vars)]
+        derived_cols = [v["name"] for v in get_parameters_metadata(derived_vars)]
+        return input_cols, input_vars, output_cols, output_vars, derived_cols, derived_vars
+
+    return GROUPS_CACHE.get((location, spray, schema_fingerprint(df)), classify)
@@ -0,0 +1,43 @@
+"""Variables computed from other columns instead of being stored
+"""
+
+# External modules
+import ast
+import numpy as np
+import numexpr as ne
+from utils.metadata import PARAMETER_METADATA
+
+# Every variable with an expression in its metadata
+DERIVED = {
+    parameter: meta for parameter, meta in PARAMETER_METADATA.items() if "expression" in meta
+}
+
+
+def _names(expression):
+    tree = ast.parse(expression, mode="eval")
+    functions = {node.func.id for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    return tuple(
+        sorted({node.id for node in ast.walk(tree) if isinstance(node, ast.Name)} - functions)
+    )
+
+
+# Stored columns each derived variable is computed from
+INPUTS = {variable: _names(meta["expression"]) for variable, meta in DERIVED.items()}
+
+
+def derivable(columns):
+    """Derived variables whose inputs are all among columns"""
+    columns = set(columns)
+    return [variable for variable, needed in INPUTS.items() if set(needed) <= columns]
+
+
+def evaluate(df, variable):
+    """Values of a derived variable over the rows of df, which must be sorted by time"""
+    meta = DERIVED[variable]
+    values = ne.evaluate(
+        meta["expression"],
+        local_dict={column: df[column].to_numpy(dtype="float64") for column in INPUTS[variable]},
+    )
+    if meta.get("accumulate"):
+        values = np.concatenate(([0.0], np.cumsum(values)[:-1]))
+    return values
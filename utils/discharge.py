@@ -0,0 +1,129 @@
+"""Fountain discharge modelled from the fitted coefficients of each site
+"""
+
+# External modules
+import os
+import json
+import numpy as np
+import pandas as pd
+from utils.cache import SharedCache
+from utils.data import data_version, load_columns
+from utils.settings import SITES
+
+DISCHARGE_CACHE = SharedCache("discharge", maxsize=64)
+
+# Gaussian over the hour of the day plus a linear term in the weather
+GAUSSIAN = ("amplitude", "center", "sigma")
+LINEAR = ("a", "b", "c", "d")
+COEFFICIENTS = GAUSSIAN + LINEAR
+
+
+def coeffs_path(location):
+    return "data/" + location + "/processed/simulations/coeffs.json"
+
+
+def fitted(locations=SITES):
+    """Sites with a fitted discharge model"""
+    return [location for location in locations if os.path.exists(coeffs_path(location))]
+
+
+def load_coeffs(location):
+    """The coefficients of coeffs.json, cached until the file changes"""
+    path = coeffs_path(location)
+    key = (location, "coeffs", os.path.getmtime(path))
+
+    def read():
+        DISCHARGE_CACHE.invalidate(lambda k: k[:2] == key[:2] and k != key)
+        with open(path, "r") as f:
+            coeffs = json.load(f)
+        return {name: float(coeffs[name]) for name in COEFFICIENTS}
+
+    return DISCHARGE_CACHE.get(key, read)
+
+
+def coefficient_table(locations):
+    """One row of coefficients per site"""
+    return pd.DataFrame([load_coeffs(location) for location in locations], index=list(locations))
+
+
+def model(table, temp, rh, wind, hour):
+    """Modelled discharge [l/min] of every site of table over the given weather.
+
+    temp [°C], rh [%], wind [m/s] and hour of the day broadcast against each
+    other; the result has one more leading axis, one entry per row of table.
+    Negative values mean the fountain cannot run and are kept, see clip().
+    """
+    weather = np.broadcast_arrays(*(np.asarray(x, dtype="float64") for x in (temp, rh, wind, hour)))
+    # Coefficients as (site, 1, ..., 1) so they broadcast over the weather grid
+    c = {
+        name: table[name].to_numpy(dtype="float64").reshape((-1,) + (1,) * weather[0].ndim)
+        for name in COEFFICIENTS
+    }
+    temp, rh, wind, hour = weather
+    gaussian = (
+        c["amplitude"]
+        / (c["sigma"] * np.sqrt(2 * np.pi))
+        * np.exp(-((hour - c["center"]) ** 2) / (2 * c["sigma"] ** 2))
+    )
+    return c["a"] * temp + c["b"] * rh + c["c"] * wind + c["d"] + gaussian
+
+
+def clip(discharge):
+    return np.fmax(discharge, 0)
+
+
+def discharge_curves(locations, temp, rh=50, wind=2, hour=12):
+    """Modelled discharge over a temperature grid as one column per site.
+
+    Sites without a cached curve for these inputs are evaluated together in
+    one call of model().
+    """
+    temp = tuple(np.asarray(temp, dtype="float64").tolist())
+    keys = {
+        location: (location, "curve", os.path.getmtime(coeffs_path(location)), temp, rh, wind, hour)
+        for location in locations
+    }
+    missing = [location for location in locations if keys[location] not in DISCHARGE_CACHE]
+    computed = {}
+    if missing:
+        values = clip(model(coefficient_table(missing), temp, rh, wind, hour))
+        computed = dict(zip(missing, values))
+
+    def curve(location):
+        # Evicted since the check above, evaluated alone
+        if location not in computed:
+            return clip(model(coefficient_table([location]), temp, rh, wind, hour))[0]
+        return computed[location]
+
+    curves = {
+        location: DISCHARGE_CACHE.get(key, lambda location=location: curve(location))
+        for location, key in keys.items()
+    }
+    return pd.DataFrame(curves, index=pd.Index(temp, name="temp"))
+
+
+def season_discharge(location, spray="man"):
+    """Observed and modelled discharge over the season of a site.
+
+    Cached until output.h5 or coeffs.json changes.
+    """
+    key = (
+        location,
+        spray,
+        "season",
+        data_version(location, spray),
+        os.path.getmtime(coeffs_path(location)),
+    )
+
+    def compute():
+        DISCHARGE_CACHE.invalidate(lambda k: k[:3] == key[:3] and k != key)
+        df = load_columns(location, spray, ("temp", "RH", "wind", "Discharge"))
+        modelled = model(
+            coefficient_table([location]), df.temp, df.RH, df.wind, df.time.dt.hour
+        )[0]
+        return pd.DataFrame(
+            {"Observed": df.Discharge.to_numpy(), "Modelled": clip(modelled)},
+            index=df.time.to_numpy(),
+        )
+
+    return DISCHARGE_CACHE.get(key, compute)
@@ -0,0 +1,122 @@
+"""Lazy reads and summaries of the uncertainty simulations of a site
+"""
+
+# External modules
+import os
+from contextlib import contextmanager
+import h5py
+import numpy as np
+import pandas as pd
+from utils.cache import SharedCache
+from utils.settings import config
+
+ENSEMBLE_CACHE = SharedCache("ensembles", maxsize=64)
+
+# uncertainpy results, one per set of uncertain parameters
+ENSEMBLES = ("weather", "fountain", "D_F", "T_F")
+# Maximum freezing rate over a temperature, humidity and wind grid
+FREEZING_RATE = "auto_sims.nc"
+FREEZING_RATE_VARIABLE = "__xarray_dataarray_variable__"
+
+# Per hour statistics uncertainpy derived from the polynomial chaos expansion.
+# The evaluations are its collocation nodes, not a random sample, so their
+# plain mean and quantiles are not the ensemble statistics.
+STATISTICS = ("mean", "variance", "percentile_5", "percentile_95")
+
+
+def sim_path(location, filename):
+    return "data/" + location + "/processed/simulations/" + filename
+
+
+def ensembles(location):
+    """The ensembles simulated for a site"""
+    return [name for name in ENSEMBLES if os.path.exists(sim_path(location, name + ".h5"))]
+
+
+@contextmanager
+def open_ensemble(location, name):
+    """The HDF5 file of an ensemble, nothing is read until it is sliced"""
+    with h5py.File(sim_path(location, name + ".h5"), "r") as f:
+        yield f
+
+
+def uncertain_parameters(location, name):
+    with open_ensemble(location, name) as f:
+        # Variable length strings, bytes with older h5py
+        return [
+            parameter.decode() if isinstance(parameter, bytes) else parameter
+            for parameter in f.attrs["uncertain parameters"]
+        ]
+
+
+def _times(location, hours):
+    _, SITE, _ = config(location)
+    return pd.Timestamp(SITE["start_date"]) + pd.to_timedelta(hours, unit="h")
+
+
+def ensemble_stats(location, name, feature=None, start=None, end=None):
+    """Stored mean, variance and 5th/95th percentiles per hour of an ensemble.
+
+    Only the hours between start and end are read from disk. Cached until the
+    file changes.
+    """
+    feature = feature or location
+    path = sim_path(location, name + ".h5")
+    key = (location, name, feature, start, end, os.path.getmtime(path))
+
+    def read():
+        ENSEMBLE_CACHE.invalidate(lambda k: k[:3] == key[:3] and k[-1] != key[-1])
+        with open_ensemble(location, name) as f:
+            group = f[feature]
+            times = _times(location, group["time"][...])
+            first = 0 if start is None else times.searchsorted(pd.Timestamp(start))
+            last = len(times) if end is None else times.searchsorted(pd.Timestamp(end), side="right")
+            stats = pd.DataFrame(
+                {statistic: group[statistic][first:last] for statistic in STATISTICS},
+                index=times[first:last],
+            )
+        return stats
+
+    return ENSEMBLE_CACHE.get(key, read)
+
+
+def freezing_rate_axes(location):
+    """Coordinates of the freezing rate grid as {dimension: values}"""
+    path = sim_path(location, FREEZING_RATE)
+    key = (location, FREEZING_RATE, "axes", os.path.getmtime(path))
+
+    def read():
+        with h5py.File(path, "r") as f:
+            return {
+                dim[0].name.lstrip("/"): dim[0][...]
+                for dim in f[FREEZING_RATE_VARIABLE].dims
+            }
+
+    return ENSEMBLE_CACHE.get(key, read)
+
+
+def freezing_rate(location, **selection):
+    """Maximum freezing rate [l/min] with some dimensions fixed to the nearest grid value.
+
+    freezing_rate("gangles21", v=2, rh=30) is a Series over temperature; only
+    that line of the grid is read from disk.
+    """
+    axes = freezing_rate_axes(location)
+    index = []
+    for dim, values in axes.items():
+        if dim in selection:
+            index.append(int(np.abs(values - selection[dim]).argmin()))
+        else:
+            index.append(slice(None))
+    with h5py.File(sim_path(location, FREEZING_RATE), "r") as f:
+        values = f[FREEZING_RATE_VARIABLE][tuple(index)]
+    free = [dim for dim in axes if dim not in selection]
+    if len(free) == 1:
+        return pd.Series(values, index=pd.Index(axes[free[0]], name=free[0]))
+    if len(free) == 2:
+        return pd.DataFrame(
+            values,
+            index=pd.Index(axes[free[0]], name=free[0]),
+            columns=pd.Index(axes[free[1]], name=free[1]),
+        )
+    return values
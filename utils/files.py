@@ -0,0 +1,24 @@
+"""Files the app writes next to the data they are derived from
+"""
+
+# External modules
+import os
+import tempfile
+
+
+def write_atomic(path, write):
+    """Calls write(tmp) on a temporary file and renames it to path.
+
+    Concurrent readers never see a partial file. Every call writes its own
+    temporary file, so sessions of one process writing the same path do not
+    rename each other's. The temporary file is removed if write fails.
+    """
+    directory, name = os.path.split(path)
+    fd, tmp = tempfile.mkstemp(prefix=name + ".", suffix=".tmp", dir=directory or ".")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
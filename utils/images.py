@@ -0,0 +1,89 @@
+"""Pre-sized WebP derivatives of the logos and figures shown by the app
+"""
+
+# External modules
+import io
+import os
+import hashlib
+import logging
+from PIL import Image
+from utils.assets import read_image
+from utils.cache import SharedCache
+from utils.files import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Derivatives persist here across restarts, keyed by source hash and width
+DERIVATIVE_DIR = os.environ.get("AIR_IMAGE_CACHE_DIR", ".cache/images")
+
+# Display widths in pixels, figures match Streamlit's 2x centered content width
+ICON_WIDTH = 64
+AIR_LOGO_WIDTH = 160
+LOGO_WIDTH = 200
+FIGURE_WIDTH = 2 * 730
+
+IMAGE_CACHE = SharedCache(
+    "images",
+    maxsize=int(os.environ.get("AIR_IMAGE_CACHE_MB", 16)) * 2**20,
+    getsizeof=len,
+)
+
+
+# Digest of every source shown so far, by path
+_digests = {}
+
+
+def source_digest(path):
+    digest = _digests.get(path)
+    if digest is None:
+        digest = _digests[path] = hashlib.sha1(read_image(path)).hexdigest()
+    return digest
+
+
+def forget(path):
+    """Drops the cached source and derivatives of an image that changed on disk"""
+    read_image.cache_clear()
+    digest = _digests.pop(path, None)
+    if digest is None:
+        return 0
+    return IMAGE_CACHE.invalidate(lambda key: key[0] == digest)
+
+
+def encode(source, width):
+    """Downscales to at most width pixels and keeps the smaller of lossy and lossless WebP"""
+    image = Image.open(io.BytesIO(source))
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+    if image.width > width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    encoded = []
+    for options in (dict(quality=85), dict(lossless=True)):
+        out = io.BytesIO()
+        image.save(out, "WEBP", method=6, **options)
+        encoded.append(out.getvalue())
+    return min(encoded, key=len)
+
+
+def _write_bytes(data, path):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def sized_image(path, width):
+    """WebP bytes of the image at path, at most width pixels wide, for st.image"""
+    digest = source_digest(path)
+
+    def derive():
+        cached = os.path.join(DERIVATIVE_DIR, "%s-%i.webp" % (digest, width))
+        if os.path.exists(cached):
+            with open(cached, "rb") as f:
+                return f.read()
+        data = encode(read_image(path), width)
+        try:
+            os.makedirs(DERIVATIVE_DIR, exist_ok=True)
+            write_atomic(cached, lambda tmp: _write_bytes(data, tmp))
+        except OSError as e:
+            logger.warning("Could not write %s: %s" % (cached, e))
+        return data
+
+    return IMAGE_CACHE.get((digest, width), derive)
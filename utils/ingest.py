@@ -0,0 +1,285 @@
+"""Append-only daily partitions of the AWS input of a site
+"""
+
+# External modules
+import io
+import os, sys
+import json
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from utils.cache import SharedCache
+from utils.files import write_atomic
+
+logger = logging.getLogger(__name__)
+
+LIVE_CACHE = SharedCache("live", maxsize=16)
+
+# Bumped whenever the layout of manifest.json changes
+MANIFEST_FORMAT = 1
+
+# Daily aggregates of the ingested AWS input: amounts per time step add up,
+# cumulative totals and ice volume keep their maximum, everything else
+# (states, rates and fluxes) is averaged
+SUM = (
+    "fountain_froze",
+    "melted",
+    "sub",
+    "wasted",
+    "ppt",
+    "dep",
+    "snow2ice",
+    "cdt",
+    "j_cone",
+    "dr",
+    "delta_T_s",
+)
+MAX = ("iceV", "input", "meltwater", "wastewater", "vapour")
+
+_locks = {}
+_locks_lock = threading.Lock()
+# Size of input.csv at the last ingest of this process
+_sizes = {}
+
+
+def input_path(location):
+    return "data/" + location + "/interim/input.csv"
+
+
+def partition_dir(location):
+    return "data/" + location + "/interim/partitions/"
+
+
+def partition_path(location, day):
+    return partition_dir(location) + day + ".parquet"
+
+
+def manifest_path(location):
+    return partition_dir(location) + "manifest.json"
+
+
+def _lock(location):
+    with _locks_lock:
+        return _locks.setdefault(location, threading.Lock())
+
+
+def read_manifest(location):
+    """Ingested state of a site, empty before the first ingest"""
+    try:
+        with open(manifest_path(location), "r") as f:
+            manifest = json.load(f)
+        if manifest["format"] == MANIFEST_FORMAT:
+            return manifest
+    except (OSError, ValueError, KeyError):
+        pass
+    return dict(format=MANIFEST_FORMAT, offset=0, header=None, last=None, partitions={})
+
+
+def aggregation(column):
+    if column in SUM:
+        return "sum"
+    if column in MAX:
+        return "max"
+    return "mean"
+
+
+def summarise(df):
+    """Mergeable statistics and the daily aggregate of one partition"""
+    numeric = df.select_dtypes("number")
+    return dict(
+        rows=len(df),
+        summary={
+            column: dict(
+                count=int(values.count()),
+                sum=float(values.sum()),
+                sumsq=float((values ** 2).sum()),
+                min=float(values.min()) if values.count() else None,
+                max=float(values.max()) if values.count() else None,
+            )
+            for column, values in numeric.items()
+        },
+        daily={column: float(numeric[column].agg(aggregation(column))) for column in numeric},
+    )
+
+
+def _read_new_rows(location, manifest):
+    """Rows appended to the CSV since the last ingest and the new byte offset"""
+    path = input_path(location)
+    with open(path, "rb") as f:
+        header = f.readline()
+        if header.decode().strip() != manifest["header"] or manifest["offset"] > os.path.getsize(path):
+            # Rewritten rather than appended, start over
+            for day in manifest["partitions"]:
+                if os.path.exists(partition_path(location, day)):
+                    os.remove(partition_path(location, day))
+            manifest.update(offset=f.tell(), header=header.decode().strip(), last=None, partitions={})
+        f.seek(manifest["offset"])
+        chunk = f.read()
+    # A line still being written is left for the next ingest
+    complete = chunk.rfind(b"\n") + 1
+    if complete == 0:
+        return None, manifest["offset"]
+    df = pd.read_csv(io.BytesIO(header + chunk[:complete]), parse_dates=["time"])
+    return df, manifest["offset"] + complete
+
+
+def ingest(location):
+    """Adds the rows appended to the interim input.csv of a site.
+
+    Only rows newer than the last ingested one are accepted. Each day that
+    receives rows has its partition rewritten and its statistics redone,
+    every other partition is left alone. Returns the days that changed.
+    """
+    with _lock(location):
+        manifest = read_manifest(location)
+        ingested = manifest["offset"]
+        df, offset = _read_new_rows(location, manifest)
+        if df is not None and manifest["last"] is not None:
+            df = df[df.time > pd.Timestamp(manifest["last"])]
+        os.makedirs(partition_dir(location), exist_ok=True)
+        days = []
+        if df is None or df.empty:
+            if offset != ingested:
+                manifest["offset"] = offset
+                write_atomic(manifest_path(location), lambda tmp: _dump(manifest, tmp))
+            return days
+
+        for day, rows in df.sort_values("time").groupby(df.time.dt.strftime("%Y-%m-%d")):
+            path = partition_path(location, day)
+            if os.path.exists(path):
+                rows = pd.concat([pd.read_parquet(path), rows], ignore_index=True)
+            write_atomic(path, lambda tmp: rows.to_parquet(tmp, engine="pyarrow", index=False))
+            manifest["partitions"][day] = summarise(rows)
+            days.append(day)
+        manifest.update(offset=offset, last=df.time.max().isoformat())
+        write_atomic(manifest_path(location), lambda tmp: _dump(manifest, tmp))
+        logger.info("Ingested %i rows of %s into %i partitions" % (len(df), location, len(days)))
+        return days
+
+
+def _dump(manifest, path):
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=4)
+
+
+def ingest_if_changed(location):
+    """ingest() when input.csv grew since the last call, never raises"""
+    try:
+        size = os.path.getsize(input_path(location))
+    except OSError:
+        return []
+    if _sizes.get(location) == size:
+        return []
+    try:
+        days = ingest(location)
+    except (OSError, ValueError) as e:
+        logger.warning("Ingest of %s failed: %s" % (location, e))
+        return []
+    _sizes[location] = size
+    return days
+
+
+def live_version(location):
+    """Changes whenever rows are ingested, None before the first ingest"""
+    try:
+        return os.path.getmtime(manifest_path(location))
+    except OSError:
+        return None
+
+
+def _live(location, what, compute):
+    # Every entry of a site is dropped once its manifest is rewritten
+    version = live_version(location)
+    key = (location, version) + what
+
+    def load():
+        LIVE_CACHE.invalidate(lambda k: k[0] == location and k[1] != version)
+        return compute()
+
+    return LIVE_CACHE.get(key, load)
+
+
+def live_manifest(location):
+    """read_manifest() shared between sessions, must not be modified"""
+    return _live(location, ("manifest",), lambda: read_manifest(location))
+
+
+def live_end(location):
+    """Time of the last ingested row, None before the first ingest"""
+    last = live_manifest(location)["last"]
+    return None if last is None else pd.Timestamp(last)
+
+
+def live_stats(location):
+    """count, mean, std, min and max per column over every partition.
+
+    Merged from the per-partition sums, no partition is read.
+    """
+
+    def compute():
+        stats = {}
+        for partition in live_manifest(location)["partitions"].values():
+            for column, s in partition["summary"].items():
+                merged = stats.setdefault(column, dict(count=0, sum=0.0, sumsq=0.0, min=None, max=None))
+                merged["count"] += s["count"]
+                merged["sum"] += s["sum"]
+                merged["sumsq"] += s["sumsq"]
+                for bound, pick in (("min", min), ("max", max)):
+                    if s[bound] is not None:
+                        merged[bound] = s[bound] if merged[bound] is None else pick(merged[bound], s[bound])
+        frame = {}
+        for column, s in stats.items():
+            n = s["count"]
+            mean = s["sum"] / n if n else np.nan
+            var = (s["sumsq"] - n * mean ** 2) / (n - 1) if n > 1 else np.nan
+            frame[column] = dict(count=n, mean=mean, std=np.sqrt(max(var, 0)), min=s["min"], max=s["max"])
+        return pd.DataFrame(frame)
+
+    return _live(location, ("stats",), compute)
+
+
+def live_daily(location):
+    """Daily aggregates of every partition, from the manifest"""
+
+    def compute():
+        partitions = live_manifest(location)["partitions"]
+        daily = pd.DataFrame({day: p["daily"] for day, p in partitions.items()}).T
+        daily.index = pd.to_datetime(daily.index)
+        return daily.sort_index()
+
+    return _live(location, ("daily",), compute)
+
+
+def load_live(location, columns=None, start=None, end=None):
+    """Ingested rows, reading only the partitions overlapping start..end"""
+
+    def read():
+        days = sorted(live_manifest(location)["partitions"])
+        if start is not None:
+            days = [day for day in days if day >= pd.Timestamp(start).strftime("%Y-%m-%d")]
+        if end is not None:
+            days = [day for day in days if day <= pd.Timestamp(end).strftime("%Y-%m-%d")]
+        read_columns = None if columns is None else ["time"] + [c for c in columns if c != "time"]
+        frames = [
+            pd.read_parquet(partition_path(location, day), engine="pyarrow", columns=read_columns)
+            for day in days
+        ]
+        if not frames:
+            return pd.DataFrame(columns=read_columns or ["time"])
+        df = pd.concat(frames, ignore_index=True)
+        if start is not None:
+            df = df[df.time >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.time <= pd.Timestamp(end)]
+        return df
+
+    return _live(location, ("rows", tuple(columns or ()), start, end), read)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level="INFO")
+    dirname = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+    os.chdir(dirname)
+    for location in sys.argv[1:] or ["guttannen22"]:
+        print(location, len(ingest(location)), "partitions updated")
@@ -0,0 +1,100 @@
+"""Prometheus metrics of the app hot paths
+"""
+
+# External modules
+import os
+import logging
+import threading
+from prometheus_client import REGISTRY, Histogram, start_http_server
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+# Local port of the /metrics endpoint, 0 disables it
+METRICS_PORT = int(os.environ.get("AIR_METRICS_PORT", 9101))
+
+_server_lock = threading.Lock()
+_server_started = False
+
+
+def _metric(kind, name, documentation, labelnames=(), **kwargs):
+    # Streamlit re-imports modules that change on disk, reuse what the first
+    # import registered instead of failing on a duplicate name
+    existing = REGISTRY._names_to_collectors.get(name)
+    if existing is not None:
+        return existing
+    return kind(name, documentation, labelnames, **kwargs)
+
+
+LOAD_SECONDS = _metric(
+    Histogram,
+    "air_data_load_seconds",
+    "Time to read a processed output from disk",
+    ["location", "spray", "source"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+SECTION_SECONDS = _metric(
+    Histogram,
+    "air_section_seconds",
+    "Time to render a section of the site page",
+    ["section"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+CHART_BYTES = _metric(
+    Histogram,
+    "air_chart_payload_bytes",
+    "Bytes of the series handed to a chart",
+    ["location", "spray"],
+    buckets=(1e3, 4e3, 16e3, 64e3, 256e3, 1e6, 4e6),
+)
+
+
+class CacheCollector:
+    """Exports the counters and sizes of every SharedCache"""
+
+    def describe(self):
+        return self.collect()
+
+    def collect(self):
+        # Looked up on every scrape so re-imported caches are picked up
+        from utils.cache import CACHES
+
+        hits = CounterMetricFamily("air_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("air_cache_misses", "Cache misses", labels=["cache"])
+        size = GaugeMetricFamily("air_cache_size", "Cache size, bytes for frame caches", labels=["cache"])
+        entries = GaugeMetricFamily("air_cache_entries", "Cached entries", labels=["cache"])
+        for name, cache in sorted(CACHES.items()):
+            stats = cache.stats()
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            size.add_metric([name], stats["currsize"])
+            entries.add_metric([name], stats["entries"])
+        yield hits
+        yield misses
+        yield size
+        yield entries
+
+
+if "air_cache_hits" not in REGISTRY._names_to_collectors:
+    REGISTRY.register(CacheCollector())
+
+
+def start_metrics_server():
+    """Serves /metrics on localhost once per process.
+
+    The default registry also carries process_resident_memory_bytes and the
+    other process metrics of prometheus_client.
+    """
+    global _server_started
+    with _server_lock:
+        if _server_started or not METRICS_PORT:
+            return
+        _server_started = True
+        try:
+            start_http_server(METRICS_PORT, addr="127.0.0.1")
+        except OSError as e:
+            logger.warning("Metrics endpoint unavailable on port %i: %s" % (METRICS_PORT, e))
+
+
+def section_timer(section):
+    return SECTION_SECONDS.labels(section).time()
@@ -0,0 +1,57 @@
+"""Warms the shared caches of every site in the background
+"""
+
+# External modules
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.settings import SITES
+
+logger = logging.getLogger(__name__)
+
+LOCATIONS = tuple(SITES)
+
+# Series charted by default on the first visit of a site
+DEFAULT_CHARTS = ("Discharge", "temp", "fountain_froze", "f_cone")
+
+# Set AIR_PREFETCH=0 to leave the caches cold, e.g. for benchmarks
+PREFETCH = os.environ.get("AIR_PREFETCH", "1") == "1"
+
+_lock = threading.Lock()
+_started = False
+
+
+def warm(location, spray="man"):
+    """Loads what the first visit of a site needs into the shared caches"""
+    from utils.charts import chart_series
+    from utils.data import load_schema, classify_columns
+    from utils.results import check_results
+    from utils.stats import load_stats
+
+    classify_columns(location, spray, load_schema(location, spray))
+    load_stats(location, spray)
+    for variable in DEFAULT_CHARTS:
+        chart_series(location, spray, variable)
+    # Logs where results.json disagrees with the timeseries
+    check_results(location, spray)
+
+
+def _warm_quietly(location, spray):
+    try:
+        warm(location, spray)
+    except Exception as e:
+        logger.warning("Prefetch of %s/%s failed: %s" % (location, spray, e))
+
+
+def prefetch(spray="man", workers=2):
+    """Starts warming every site once per process and returns immediately"""
+    global _started
+    with _lock:
+        if _started or not PREFETCH:
+            return
+        _started = True
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+    for location in LOCATIONS:
+        executor.submit(_warm_quietly, location, spray)
+    executor.shutdown(wait=False)
@@ -0,0 +1,100 @@
+"""Captures a profile of one app rerun on demand
+"""
+
+# External modules
+import os, sys
+import re
+import time
+import cProfile
+import threading
+import collections
+from contextlib import contextmanager
+import streamlit as st
+
+# Profiles land here, named after the site and selection of the rerun
+PROFILE_DIR = os.environ.get("AIR_PROFILE_DIR", "profiles")
+
+_rerun = threading.local()
+
+
+def requested_mode():
+    """sample or cprofile from AIR_PROFILE or the ?profile= query parameter"""
+    mode = os.environ.get("AIR_PROFILE")
+    if not mode:
+        # Outside of a session (bare mode) the query parameters are ""
+        params = st.experimental_get_query_params() or {}
+        mode = params.get("profile", [None])[0]
+    if mode in ("1", "true"):
+        mode = "sample"
+    return mode if mode in ("sample", "cprofile") else None
+
+
+def label(*parts):
+    """Names the profile of the current rerun, no-op when not profiling"""
+    if getattr(_rerun, "label", None) is not None:
+        _rerun.label = [str(part) for part in parts]
+
+
+class Sampler(threading.Thread):
+    """Samples the stack of one thread into folded stacks for flamegraph.pl or speedscope"""
+
+    def __init__(self, thread_id, interval=0.001):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    "%s (%s:%i)"
+                    % (code.co_name, os.path.basename(code.co_filename), code.co_firstlineno)
+                )
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.items():
+                f.write("%s %i\n" % (stack, count))
+
+
+@contextmanager
+def profile_rerun():
+    """Profiles the enclosed rerun when requested, otherwise does nothing"""
+    mode = requested_mode()
+    if mode is None:
+        yield
+        return
+
+    _rerun.label = ["Home"]
+    if mode == "sample":
+        profiler = Sampler(threading.get_ident())
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if mode == "sample":
+            profiler.stop()
+        else:
+            profiler.disable()
+        name = re.sub(r"[^A-Za-z0-9]+", "-", " ".join(_rerun.label)).strip("-")
+        _rerun.label = None
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, "%s_%s" % (time.strftime("%Y%m%d-%H%M%S"), name))
+        if mode == "sample":
+            profiler.dump(path + ".folded")
+        else:
+            profiler.dump_stats(path + ".prof")
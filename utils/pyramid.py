@@ -0,0 +1,57 @@
+"""Hourly, 6-hourly, daily and weekly levels of the processed outputs for charts
+"""
+
+# External modules
+import numpy as np
+import pandas as pd
+from utils.data import data_version, frame_cache, frame_nbytes, load_columns
+
+# Coarsest last, the first level is the model time step
+LEVELS = (
+    ("hourly", pd.Timedelta(hours=1)),
+    ("6-hourly", pd.Timedelta(hours=6)),
+    ("daily", pd.Timedelta(days=1)),
+    ("weekly", pd.Timedelta(days=7)),
+)
+
+PYRAMID_CACHE = frame_cache(
+    "pyramid", getsizeof=lambda pyramid: sum(frame_nbytes(series) for series in pyramid.values())
+)
+
+
+def extremes(series, freq):
+    """The minimum and maximum of every freq bucket at the time they occur.
+
+    Unlike a mean or sum per bucket this keeps the peaks of the series and
+    its units, e.g. kg per hour for per step amounts.
+    """
+    series = series.dropna()
+    buckets = series.index.floor(freq)
+    lows = series.groupby(buckets).idxmin()
+    highs = series.groupby(buckets).idxmax()
+    return series.loc[np.union1d(lows.to_numpy(), highs.to_numpy())]
+
+
+def build_pyramid(series):
+    """Returns every level coarser than the model time step of a time indexed series"""
+    return {level: extremes(series, freq) for level, freq in LEVELS[1:]}
+
+
+def load_pyramid(location, spray, variable):
+    """Coarse levels of one variable, reading only that column"""
+    key = (location, spray, data_version(location, spray), variable)
+
+    def read():
+        PYRAMID_CACHE.invalidate(lambda k: k[:2] == key[:2] and k[2] != key[2])
+        df = load_columns(location, spray, [variable])
+        return build_pyramid(df.set_index("time")[variable])
+
+    return PYRAMID_CACHE.get(key, read)
+
+
+def choose_level(span, budget):
+    """Finest level that shows span in at most budget buckets"""
+    for level, freq in LEVELS:
+        if span / freq <= budget:
+            return level
+    return LEVELS[-1][0]
@@ -0,0 +1,137 @@
+"""Mass budget of a site recomputed from its timeseries and checked against results.json
+"""
+
+# External modules
+import os
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from utils.cache import SharedCache
+from utils.data import data_version, load_output
+from utils.settings import SITES, config
+
+logger = logging.getLogger(__name__)
+
+RESULTS_CACHE = SharedCache("results", maxsize=64)
+
+# Cumulative columns of output.h5, their last value is the season total
+CUMULATIVE = dict(M_input="input", M_water="meltwater", M_sub="vapour", M_waste="wastewater")
+# Hourly columns summed over the season
+HOURLY = dict(M_ppt="snow2ice", M_dep="dep", M_F="Discharge")
+
+# results.json stores truncated integers, allow for that and float noise
+RTOL = 0.01
+
+
+def results_path(location, spray="man"):
+    return "data/" + location + "/processed/" + spray + "/results.json"
+
+
+def sprays(location):
+    """Runs of a site with stored results, e.g. man, auto and auto_field"""
+    folder = "data/" + location + "/processed/"
+    try:
+        names = sorted(os.listdir(folder))
+    except OSError:
+        return []
+    return [name for name in names if os.path.exists(results_path(location, name))]
+
+
+def initial_ice(df, DX, RHO_I):
+    """Mass [kg] of the ice dome a run starts from, below its surface layer.
+
+    Seeded runs start on a cone of radius r_cone and height h_cone; the
+    model counts the part under the surface layer of thickness DX as neither
+    fountain water nor ice it built.
+    """
+    r_cone, h_cone = df.r_cone.to_numpy()[0], df.h_cone.to_numpy()[0]
+    return RHO_I * np.pi * r_cone ** 2 * max(h_cone - DX, 0) / 3
+
+
+def compute_results(df, dome=0):
+    """Same fields as results.json from one output.h5 frame.
+
+    dome is the initial_ice() of the run, left out of M_F and M_ice.
+    """
+    cumulative = df[list(CUMULATIVE.values())].to_numpy()[-1]
+    hourly = df[list(HOURLY.values())].to_numpy().sum(axis=0)
+    discharge = df.Discharge.to_numpy()
+    r_cone = df.r_cone.to_numpy()
+
+    results = dict(zip(CUMULATIVE, cumulative))
+    results.update(zip(HOURLY, hourly))
+    # Discharge is in l/min with hourly steps
+    results["M_F"] = results["M_F"] * 60 - dome
+    results["M_ice"] = df.ice.to_numpy()[-1] - dome
+    results["WUE"] = (results["M_ice"] + results["M_water"]) / results["M_input"] * 100
+    results["iceV_max"] = np.nanmax(df.iceV.to_numpy())
+    results["last_hour"] = df.shape[0]
+    results["D_F"] = discharge[discharge != 0].mean() if discharge.any() else 0
+    results["R_F"] = r_cone[r_cone != 0][0] if r_cone.any() else 0
+    return {key: int(value) for key, value in sorted(results.items())}
+
+
+def recompute_results(location, spray="man"):
+    """Mass budget of a site from output.h5, cached until the file changes"""
+    key = (location, spray, "timeseries", data_version(location, spray))
+
+    def compute():
+        RESULTS_CACHE.invalidate(lambda k: k[:3] == key[:3] and k != key)
+        CONSTANTS, SITE, _ = config(location, spray)
+        df = load_output(location, spray)
+        return compute_results(df, initial_ice(df, SITE["DX"], CONSTANTS["RHO_I"]))
+
+    return RESULTS_CACHE.get(key, compute)
+
+
+def load_results(location, spray="man"):
+    """The stored results.json of a site"""
+    path = results_path(location, spray)
+    key = (location, spray, "stored", os.path.getmtime(path))
+
+    def read():
+        RESULTS_CACHE.invalidate(lambda k: k[:3] == key[:3] and k != key)
+        with open(path, "r") as f:
+            return json.load(f)
+
+    return RESULTS_CACHE.get(key, read)
+
+
+def differences(stored, computed, rtol=RTOL):
+    """Fields where stored and computed disagree, as {field: (stored, computed)}"""
+    return {
+        field: (stored.get(field), value)
+        for field, value in computed.items()
+        if stored.get(field) is None
+        or abs(stored[field] - value) > max(1, rtol * max(abs(stored[field]), abs(value)))
+    }
+
+
+def check_results(location, spray="man"):
+    """Differences between results.json and the timeseries of a site, logged"""
+    diff = differences(load_results(location, spray), recompute_results(location, spray))
+    for field, (stored, computed) in diff.items():
+        logger.warning(
+            "%s/%s results.json %s=%s, timeseries gives %s" % (location, spray, field, stored, computed)
+        )
+    return diff
+
+
+def check_all(locations=None, workers=4):
+    """Checks every site and spray with stored results in parallel"""
+    cases = [(location, spray) for location in locations or SITES for spray in sprays(location)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        diffs = executor.map(lambda case: check_results(*case), cases)
+        return dict(zip(cases, diffs))
+
+
+if __name__ == "__main__":
+    dirname = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+    os.chdir(dirname)
+    # The table below reports the same differences
+    logger.setLevel("ERROR")
+    for (location, spray), diff in check_all().items():
+        print("%-12s %-5s %s" % (location, spray, "ok" if not diff else ""))
+        for field, (stored, computed) in diff.items():
+            print("    %-10s stored %10s  computed %10s" % (field, stored, computed))
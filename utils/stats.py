@@ -0,0 +1,86 @@
+"""Summary statistics of the processed outputs, stored next to output.h5
+"""
+
+# External modules
+import json
+import logging
+import pandas as pd
+from utils.cache import SharedCache
+from utils.data import data_version, load_columns, load_output
+from utils.files import write_atomic
+
+logger = logging.getLogger(__name__)
+
+STATS_CACHE = SharedCache("stats", maxsize=64)
+
+# Bumped whenever the layout of stats.json changes
+STATS_FORMAT = 2
+
+
+def stats_path(location, spray="man"):
+    return "data/" + location + "/processed/" + spray + "/stats.json"
+
+
+def compute_stats(location, spray="man"):
+    """describe() of every numeric column plus the fountain table metrics"""
+    df = load_output(location, spray)
+    # Compact frames hold float32, which json cannot write; sum in float64
+    numeric = df.select_dtypes("number").astype("float64")
+    fountain_on = numeric[numeric.Discharge != 0]
+    return dict(
+        format=STATS_FORMAT,
+        version=data_version(location, spray),
+        start=df.time.min().isoformat(),
+        end=df.time.max().isoformat(),
+        describe={
+            column: {stat: float(value) for stat, value in numeric[column].describe().items()}
+            for column in numeric.columns
+        },
+        fountain=dict(
+            fountain_froze_mean=float(fountain_on.fountain_froze.mean()),
+            melted_mean=float(numeric.melted.mean()),
+            runtime=int(fountain_on.shape[0]),
+        ),
+    )
+
+
+def _dump(stats, path):
+    with open(path, "w") as f:
+        json.dump(stats, f, indent=4)
+
+
+def build_stats(location, spray="man"):
+    """Writes the statistics sidecar of a site, returns the statistics"""
+    stats = compute_stats(location, spray)
+    path = stats_path(location, spray)
+    try:
+        write_atomic(path, lambda tmp: _dump(stats, tmp))
+    except OSError as e:
+        logger.warning("Could not write %s: %s" % (path, e))
+    return stats
+
+
+def load_stats(location, spray="man"):
+    """Returns the statistics of a site, rebuilding them when output.h5 changed"""
+    version = data_version(location, spray)
+    key = (location, spray, version)
+
+    def read():
+        STATS_CACHE.invalidate(lambda k: k[:2] == key[:2] and k != key)
+        try:
+            with open(stats_path(location, spray), "r") as f:
+                stats = json.load(f)
+            if stats["format"] == STATS_FORMAT and stats["version"] == version:
+                return stats
+        except (OSError, ValueError, KeyError):
+            pass
+        return build_stats(location, spray)
+
+    return STATS_CACHE.get(key, read)
+
+
+def describe(location, spray, variable, start=None, end=None):
+    """Same Series as df[variable].describe(), over the whole season by default"""
+    if start is None and end is None:
+        return pd.Series(load_stats(location, spray)["describe"][variable], name=variable)
+    return load_columns(location, spray, [variable], start, end)[variable].describe()
@@ -0,0 +1,82 @@
+"""Columnar Parquet copies of the processed outputs
+"""
+
+# External modules
+import os
+import glob
+import logging
+import pandas as pd
+import pyarrow.parquet as pq
+from utils.derived import derivable
+from utils.files import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Rows are sorted by time, so every row group covers one week of hourly data
+# and its min/max statistics act as the time index
+ROW_GROUP_ROWS = 24 * 7
+
+
+def store_path(location, spray="man"):
+    return "data/" + location + "/processed/" + spray + "/output.parquet"
+
+
+def is_current(location, spray="man"):
+    """True if the Parquet store exists and is not older than output.h5"""
+    path = store_path(location, spray)
+    h5 = os.path.splitext(path)[0] + ".h5"
+    return os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(h5)
+
+
+def convert(location, spray="man"):
+    """Writes output.h5 of a site as a Parquet file next to it"""
+    path = store_path(location, spray)
+    df = pd.read_hdf(os.path.splitext(path)[0] + ".h5", "df").sort_values("time")
+    # Computed from the other columns when read, see utils/derived.py
+    df = df.drop(columns=derivable(df.columns))
+    write_atomic(
+        path, lambda tmp: df.to_parquet(tmp, engine="pyarrow", index=False, row_group_size=ROW_GROUP_ROWS)
+    )
+    logger.info("Converted %s" % path)
+    return path
+
+
+def convert_all():
+    paths = []
+    for h5 in sorted(glob.glob("data/*/processed/*/output.h5")):
+        location, spray = h5.split(os.sep)[1], h5.split(os.sep)[3]
+        paths.append(convert(location, spray))
+    return paths
+
+
+def read_schema(location, spray="man"):
+    """Returns an empty frame with the columns and dtypes of the store"""
+    return pq.read_schema(store_path(location, spray)).empty_table().to_pandas()
+
+
+def read_columns(location, spray, columns, start=None, end=None):
+    """Reads only the given columns and time from the store.
+
+    With start and/or end only the row groups overlapping that time window are
+    read, and the rows are cut to start <= time <= end.
+    """
+    columns = ["time"] + [column for column in columns if column != "time"]
+    filters = []
+    if start is not None:
+        filters.append(("time", ">=", pd.Timestamp(start)))
+    if end is not None:
+        filters.append(("time", "<=", pd.Timestamp(end)))
+    return pd.read_parquet(
+        store_path(location, spray),
+        engine="pyarrow",
+        columns=columns,
+        filters=filters or None,
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level="INFO")
+    dirname = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+    os.chdir(dirname)
+    for path in convert_all():
+        print(path)
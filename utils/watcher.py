@@ -0,0 +1,109 @@
+"""Drops cached entries whose source file changed on disk
+"""
+
+# External modules
+import os
+import logging
+import threading
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+from utils.cache import CACHES
+
+logger = logging.getLogger(__name__)
+
+# Set AIR_WATCH=0 to rely on the mtime checks of the next rerun alone
+WATCH = os.environ.get("AIR_WATCH", "1") == "1"
+WATCHED_DIRS = ("data", "logos")
+
+# Written by the app itself, next to the files it derives them from
+SIDECARS = ("output.parquet", "stats.json", "manifest.json")
+IMAGES = (".png", ".jpg", ".jpeg")
+CHANGES = ("created", "modified", "moved", "deleted")
+
+_lock = threading.Lock()
+_observer = None
+
+
+def dependents(path):
+    """(cache name, key match) of the entries derived from a data file"""
+    parts = os.path.normpath(path).split(os.sep)
+    if len(parts) < 4 or parts[0] != "data" or parts[2] != "processed":
+        return []
+    location, filename = parts[1], parts[-1]
+
+    if len(parts) == 5 and parts[3] == "simulations":
+        stem = os.path.splitext(filename)[0]
+        if filename.startswith("loo-cv-"):
+            run = filename[len("loo-cv-"):]
+            return [("calibration", lambda k: k[:2] == (location, run))]
+        if filename == "coeffs.json":
+            return [("discharge", lambda k: k[0] == location)]
+        return [("ensembles", lambda k: k[0] == location and k[1] in (stem, filename))]
+
+    if len(parts) == 5:
+        spray = parts[3]
+        if filename == "output.h5":
+            site = lambda k: k[:2] == (location, spray)
+            caches = (
+                "frames", "projections", "derived", "schemas", "groups", "pyramid", "stats",
+                "charts", "whatif", "discharge",
+            )
+            return [(name, site) for name in caches] + [
+                ("results", lambda k: k[:3] == (location, spray, "timeseries"))
+            ]
+        if filename == "results.json":
+            return [("results", lambda k: k[:3] == (location, spray, "stored"))]
+    return []
+
+
+def invalidate(path):
+    """Drops every cached entry that depends on path, returns their number"""
+    if path.endswith(".tmp") or os.path.basename(path) in SIDECARS:
+        return 0
+    dropped = 0
+    for name, match in dependents(path):
+        cache = CACHES.get(name)
+        if cache is not None:
+            dropped += cache.invalidate(match)
+    if path.lower().endswith(IMAGES):
+        from utils.images import forget
+
+        dropped += forget(path)
+    if dropped:
+        logger.info("%s changed, dropped %i cached entries" % (path, dropped))
+    return dropped
+
+
+class Invalidator(FileSystemEventHandler):
+    def __init__(self, root):
+        self.root = root
+
+    def on_any_event(self, event):
+        # Newer watchdog also reports files being opened and read
+        if event.is_directory or event.event_type not in CHANGES:
+            return
+        for path in (event.src_path, getattr(event, "dest_path", None)):
+            if path:
+                # Keys and image paths are relative to the repository root
+                invalidate(os.path.relpath(path, self.root))
+
+
+def start_watcher(root="."):
+    """Watches the data and logo folders once per process"""
+    global _observer
+    with _lock:
+        if _observer is not None or not WATCH:
+            return
+        root = os.path.abspath(root)
+        observer = Observer()
+        observer.daemon = True
+        handler = Invalidator(root)
+        for directory in WATCHED_DIRS:
+            if os.path.isdir(os.path.join(root, directory)):
+                observer.schedule(handler, os.path.join(root, directory), recursive=True)
+        try:
+            observer.start()
+        except OSError as e:
+            logger.warning("File watcher unavailable: %s" % e)
+            return
+        _observer = observer